@@ -20,6 +20,9 @@ Pacman agents (in searchAgents.py).
 import util
 import searchAgents
 import game
+import heapq
+import time
+import collections
 
 class SearchProblem:
     """
@@ -76,7 +79,121 @@ def tinyMazeSearch(problem):
     w = Directions.WEST
     return  [s, s, w, s, w, w, s, w]
 
-def depthFirstSearch(problem):
+class SearchStats:
+    """
+    Counters and timers that a search fills in while it runs, so a slow
+    layout can be broken down without an external profiler.
+
+      expanded        states passed to getSuccessors (or getPredecessors)
+      generated       successors those calls returned
+      duplicates      generated states dropped because they were already
+                      reached at least as cheaply, or are on the current path
+      peakFrontier    most entries waiting in the frontier at once
+      peakClosed      most states held as already expanded at once (SMA*
+                      keeps no closed set and leaves this at 0)
+      successorTime   seconds spent in getSuccessors and getPredecessors
+      heuristicCalls  number of heuristic evaluations
+      heuristicTime   seconds spent in the heuristic
+      elapsed         seconds spent in the whole search
+      pathLength      number of actions in the returned plan
+      bound           for anytime searches, how many times the optimal cost
+                      the returned plan may cost at most (1.0 is optimal)
+
+    Every search function takes an optional stats argument to fill in, and
+    leaves the stats it used on problem.searchStats either way.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.peakFrontier = 0
+        self.peakClosed = 0
+        self.successorTime = 0.0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+        self.elapsed = 0.0
+        self.pathLength = None
+        self.bound = None
+        self.startTime = None
+
+    def start(self, problem):
+        "Attaches the stats to problem and starts the search clock"
+        problem.searchStats = self
+        self.startTime = time.time()
+        return self
+
+    def finish(self, actions):
+        "Stops the search clock and passes the plan through"
+        self.elapsed = time.time() - self.startTime
+        self.pathLength = len(actions)
+        return actions
+
+    def timeSuccessors(self, getSuccessors):
+        "Wraps a successor function so that its calls are counted and timed"
+        def timedSuccessors(*args):
+            starttime = time.time()
+            triples = getSuccessors(*args)
+            self.successorTime += time.time() - starttime
+            self.expanded += 1
+            self.generated += len(triples)
+            return triples
+        return timedSuccessors
+
+    def timeSuccessorsBatch(self, getSuccessorsBatch):
+        "Like timeSuccessors, for a function that expands a list of states at once"
+        def timedSuccessorsBatch(states):
+            starttime = time.time()
+            batch = getSuccessorsBatch(states)
+            self.successorTime += time.time() - starttime
+            self.expanded += len(states)
+            self.generated += sum([len(triples) for triples in batch])
+            return batch
+        return timedSuccessorsBatch
+
+    def timeHeuristic(self, heuristic):
+        "Wraps a heuristic so that its calls are counted and timed"
+        def timedHeuristic(*args):
+            starttime = time.time()
+            value = heuristic(*args)
+            self.heuristicTime += time.time() - starttime
+            self.heuristicCalls += 1
+            return value
+        return timedHeuristic
+
+    def frontierSize(self, size):
+        if size > self.peakFrontier:
+            self.peakFrontier = size
+
+    def closedSize(self, size):
+        if size > self.peakClosed:
+            self.peakClosed = size
+
+    def nodesPerSecond(self):
+        if self.elapsed == 0:
+            return 0.0
+        return self.expanded / self.elapsed
+
+    def __str__(self):
+        text = ('Search stats: %d expanded, %d generated, %d duplicates, peak frontier %d, '
+                'peak closed %d, %.3fs in successors, %.3fs in %d heuristic calls, '
+                '%.3fs total, %.0f nodes/s') % (
+                self.expanded, self.generated, self.duplicates, self.peakFrontier,
+                self.peakClosed, self.successorTime, self.heuristicTime, self.heuristicCalls,
+                self.elapsed, self.nodesPerSecond())
+        if self.bound != None:
+            text += ', suboptimality bound %.3f' % self.bound
+        return text
+
+def queueLength(queue):
+    "The number of entries in a util.Stack, util.Queue, util.PriorityQueue or one of the queues below"
+    if hasattr(queue, '__len__'):
+        return len(queue)
+    if hasattr(queue, 'heap'):
+        return len(queue.heap)
+    return len(queue.list)
+
+def depthFirstSearch(problem, stats=None):
     """
     Search the deepest nodes in the search tree first.
 
@@ -86,18 +203,21 @@ def depthFirstSearch(problem):
     To get started, you might want to try some of these simple commands to
     understand the search problem that is being passed in:
     """
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+
     # for this problem we used stack(Last in first out) to implement depth first search.
     stack = util.Stack()
     stack.push(problem.getStartState())
 
     visited = set([])
 
-    pathsDic = {} # dictionary that has key as state and value as the path to key state
-    pathsDic[problem.getStartState()] = []
+    parentsDic = {} # dictionary that has key as state and value as (parent state, action from parent)
+    parentsDic[problem.getStartState()] = None
 
     while True:
         if stack.isEmpty():
-            return [] # if it fails, return empty list
+            return stats.finish([]) # if it fails, return empty list
         else:
             currentState = stack.pop()
             if currentState in visited:
@@ -106,16 +226,26 @@ def depthFirstSearch(problem):
             else:
                 visited.add(currentState)
                 if problem.isGoalState(currentState): # if we reach the goal, return path
-                    return pathsDic[currentState]
+                    return stats.finish(reconstructPath(parentsDic, currentState))
                 else:
-                    triples = problem.getSuccessors(currentState)
+                    triples = getSuccessors(currentState)
                     for triple in triples:
-                        stack.push(triple[0])
-                        pathsDic[triple[0]] = pathsDic[currentState] + [triple[1]]
+                        # a visited state already has its final parent, so only the
+                        # states still waiting on the stack get re-pointed
+                        if triple[0] not in visited:
+                            stack.push(triple[0])
+                            parentsDic[triple[0]] = (currentState, triple[1])
+                        else:
+                            stats.duplicates += 1
+                    stats.frontierSize(queueLength(stack))
+                    stats.closedSize(len(visited))
 
 
-def breadthFirstSearch(problem):
+def breadthFirstSearch(problem, stats=None):
     """Search the shallowest nodes in the search tree first."""
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+
     # for this problem we used queue (First in First out) to travel and search for 
     # each level (and gradually increase the levels to explore)
     startingState = problem.getStartState()
@@ -124,12 +254,12 @@ def breadthFirstSearch(problem):
 
     visited = set([])
 
-    pathsDic = {} # dictionary that has key as state and value as the path to key state
-    pathsDic[startingState] = []
+    parentsDic = {} # dictionary that has key as state and value as (parent state, action from parent)
+    parentsDic[startingState] = None
 
     while True:
         if queue.isEmpty():
-            return [] # if it fails, return empty list
+            return stats.finish([]) # if it fails, return empty list
         else:
             currentState = queue.pop()
             if currentState in visited:
@@ -138,31 +268,84 @@ def breadthFirstSearch(problem):
             else:
                 visited.add(currentState)
                 if problem.isGoalState(currentState): # if we reach the goal, return path
-                    return pathsDic[currentState]
+                    return stats.finish(reconstructPath(parentsDic, currentState))
 
                 else:
-                    triples = problem.getSuccessors(currentState)
+                    triples = getSuccessors(currentState)
                     for triple in triples:
-                        queue.push(triple[0])
-                        if triple[0] not in pathsDic.keys():
-                            pathsDic[triple[0]] = pathsDic[currentState] + [triple[1]]
+                        if triple[0] not in parentsDic:
+                            queue.push(triple[0])
+                            parentsDic[triple[0]] = (currentState, triple[1])
+                        else:
+                            stats.duplicates += 1
+                    stats.frontierSize(queueLength(queue))
+                    stats.closedSize(len(visited))
+
+def batchBreadthFirstSearch(problem, stats=None):
+    """
+    Breadth first search that expands a whole layer of states with one call
+    to problem.getSuccessorsBatch(states), which returns the successor list of
+    each state in order.  Problems without a batch interface fall back to
+    calling getSuccessors once per state.  The goal test is done when a state
+    is generated, so the layer holding the goal is never expanded.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessorsBatch = getattr(problem, 'getSuccessorsBatch', None)
+    if getSuccessorsBatch == None:
+        getSuccessorsBatch = lambda states: [problem.getSuccessors(state) for state in states]
+    getSuccessorsBatch = stats.timeSuccessorsBatch(getSuccessorsBatch)
+
+    startingState = problem.getStartState()
+    if problem.isGoalState(startingState):
+        return stats.finish([])
+
+    parentsDic = {} # dictionary that has key as state and value as (parent state, action from parent)
+    parentsDic[startingState] = None
+
+    layer = [startingState]
+    while layer:
+        nextLayer = []
+        for currentState, triples in zip(layer, getSuccessorsBatch(layer)):
+            for triple in triples:
+                if triple[0] in parentsDic:
+                    stats.duplicates += 1
+                    continue
+                parentsDic[triple[0]] = (currentState, triple[1])
+                if problem.isGoalState(triple[0]): # if we reach the goal, return path
+                    return stats.finish(reconstructPath(parentsDic, triple[0]))
+                nextLayer.append(triple[0])
+        layer = nextLayer
+        stats.frontierSize(len(layer))
+        stats.closedSize(len(parentsDic))
+    return stats.finish([]) # if it fails, return empty list
+
+def uniformCostSearch(problem, frontier=None, stats=None):
+    """
+    Search the node of least total cost first.
+
+    frontier is the queue class to use; it defaults to IndexedPriorityQueue,
+    whose update is an O(log n) decrease-key.  util.PriorityQueue or any
+    class with the same interface can be passed in its place.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
 
-def uniformCostSearch(problem):
-    """Search the node of least total cost first."""
-    pqueue = util.PriorityQueue()
+    if frontier is None:
+        frontier = IndexedPriorityQueue
+    pqueue = frontier()
     pqueue.push(problem.getStartState(), 0)
 
     visited = set([])
 
-    pathsDic = {} # dictionary that has key as state and value as the path to key state
-    pathsDic[problem.getStartState()] = []
+    parentsDic = {} # dictionary that has key as state and value as (parent state, action from parent)
+    parentsDic[problem.getStartState()] = None
 
     costDic = {} # dictionary that has key as state and value as minimum cumulated cost
     costDic[problem.getStartState()] = 0
 
     while True:
         if pqueue.isEmpty():
-            return [] # if it fails, return empty list
+            return stats.finish([]) # if it fails, return empty list
         else:
             currentState = pqueue.pop()
             if currentState in visited:
@@ -171,26 +354,44 @@ def uniformCostSearch(problem):
             else:
                 visited.add(currentState)
                 if problem.isGoalState(currentState): # if we reach the goal, return path
-                    return pathsDic[currentState]
+                    return stats.finish(reconstructPath(parentsDic, currentState))
 
                 else:
-                    triples = problem.getSuccessors(currentState)
+                    triples = getSuccessors(currentState)
                     # for each triple (successor, action, stepcost) returned from getSuccessors
                     for triple in triples:
                         newcost = costDic[currentState] + triple[2]
                         # if cost is already calculated and newcost is more optimal
-                        # update the priority queue and path dictionary with more optimal
+                        # update the priority queue and parent dictionary with more optimal
                         # path
-                        if triple[0] in costDic.keys() and costDic[triple[0]] > newcost:
+                        if triple[0] in costDic and costDic[triple[0]] > newcost:
                             costDic[triple[0]] = newcost
-                            pathsDic[triple[0]] = pathsDic[currentState] + [triple[1]]
+                            parentsDic[triple[0]] = (currentState, triple[1])
                             pqueue.update(triple[0], newcost)
 
-                        elif not triple[0] in costDic.keys():
-                            costDic[triple[0]] = costDic[currentState] + triple[2]
-                            pathsDic[triple[0]] = pathsDic[currentState] + [triple[1]]
+                        elif not triple[0] in costDic:
+                            costDic[triple[0]] = newcost
+                            parentsDic[triple[0]] = (currentState, triple[1])
                             pqueue.update(triple[0], costDic[triple[0]])
 
+                        else:
+                            stats.duplicates += 1
+                    stats.frontierSize(queueLength(pqueue))
+                    stats.closedSize(len(visited))
+
+def reconstructPath(parentsDic, state):
+    """
+    Walks the parent pointers stored by a search back from state to the start
+    state (whose entry is None) and returns the actions in forward order.
+    """
+    actions = []
+    link = parentsDic[state]
+    while link is not None:
+        state, action = link
+        actions.append(action)
+        link = parentsDic[state]
+    actions.reverse()
+    return actions
 
 
 def nullHeuristic(state, problem=None):
@@ -200,54 +401,965 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
-def aStarSearch(problem, heuristic=nullHeuristic):
-    """Search the node that has the lowest combined cost and heuristic first."""
-    """Search the node of least total cost first."""
-    pqueue = util.PriorityQueue()
+class HeuristicCache:
+    """
+    Memoizes a heuristic with a bounded, least recently used cache, e.g.
+
+      aStarSearch(problem, HeuristicCache(foodHeuristic))
+
+    Values are keyed by key(state), which defaults to the state itself; the
+    packed states of PackedFoodSearchProblem and CornersProblem are already a
+    position plus a bitmask, so they make compact keys.  Once maxSize values
+    are held, the one used longest ago is evicted.  hits, misses and
+    evictions count what the cache did.  Do not wrap a heuristic that is
+    meant to change during the search (see aStarSearch's dynamicHeuristic).
+    """
+
+    def __init__(self, heuristic, maxSize=100000, key=None):
+        self.heuristic = heuristic
+        self.maxSize = maxSize
+        self.key = key
+        self.values = collections.OrderedDict() # oldest use first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __call__(self, state, problem=None):
+        key = state
+        if self.key != None:
+            key = self.key(state)
+        values = self.values
+        if key in values:
+            self.hits += 1
+            value = values.pop(key)
+            values[key] = value # mark as most recently used
+            return value
+        self.misses += 1
+        value = self.heuristic(state, problem)
+        values[key] = value
+        if len(values) > self.maxSize:
+            values.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def hitRate(self):
+        calls = self.hits + self.misses
+        if calls == 0:
+            return 0.0
+        return float(self.hits) / calls
+
+    def __str__(self):
+        return 'Heuristic cache: %d hits, %d misses (%.1f%% hit rate), %d evictions, %d/%d entries' % (
+            self.hits, self.misses, 100 * self.hitRate(), self.evictions, len(self.values), self.maxSize)
+
+def aStarSearch(problem, heuristic=nullHeuristic, dynamicHeuristic=False, frontier=None, stats=None):
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    The frontier defaults to a LazyPriorityQueue: finding a cheaper path
+    pushes a fresh entry and the old one is dropped when it surfaces.  Any
+    queue class with the util.PriorityQueue interface (push, pop, isEmpty,
+    update) can be passed as frontier instead, e.g. IndexedPriorityQueue.
+    Each generated state calls the heuristic once, so an expansion costs
+    O(log n) queue work.
+
+    dynamicHeuristic: set this for heuristics whose value for a state can
+    change while the search runs.  A popped state then has its heuristic
+    recomputed, and if the value went up it is pushed back with the new key
+    instead of being expanded.  Only states that reach the top of the queue
+    are ever re-keyed; the rest of the frontier is left alone.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    heuristic = stats.timeHeuristic(heuristic)
+
+    if frontier is None:
+        frontier = LazyPriorityQueue
+    pqueue = frontier()
     startState = problem.getStartState()
-    pqueue.push(startState, heuristic(startState, problem))
 
-    visited = set([]) # save all states that were queued then popped from the queue
+    parentsDic = {} # dictionary that has key as state and value as (parent state, action from parent)
+    parentsDic[startState] = None
 
-    pathsDic = {} # dictionary that has key as state and value as the path to key state
-    pathsDic[problem.getStartState()] = []
+    costDic = {} # dictionary that has key as state and value as its cheapest known cumulative cost
+    costDic[startState] = 0
 
-    costDic = {} # dictionary that has key as state and value as its cumulative cost
-    costDic[problem.getStartState()] = 0
+    heuristicDic = {} # dictionary that has key as state and value as the heuristic in its queue key
+    heuristicDic[startState] = heuristic(startState, problem)
+    pqueue.push(startState, heuristicDic[startState])
+
+    while not pqueue.isEmpty():
+        currentState = pqueue.pop()
+        g = costDic[currentState]
+
+        if dynamicHeuristic:
+            newH = heuristic(currentState, problem)
+            if newH > heuristicDic[currentState]:
+                heuristicDic[currentState] = newH
+                pqueue.push(currentState, g + newH)
+                continue
+
+        # if we reach the goal, return path
+        if problem.isGoalState(currentState):
+            return stats.finish(reconstructPath(parentsDic, currentState))
 
+        # for each triple (successor, action, stepcost) returned from getSuccessors
+        for successor, action, stepCost in getSuccessors(currentState):
+            newCost = g + stepCost
+            # only a strictly cheaper path is queued; a state that was already
+            # expanded is reopened this way if the heuristic is inconsistent
+            if successor not in costDic or newCost < costDic[successor]:
+                costDic[successor] = newCost
+                parentsDic[successor] = (currentState, action)
+                succH = heuristic(successor, problem)
+                heuristicDic[successor] = succH
+                pqueue.update(successor, newCost + succH)
+            else:
+                stats.duplicates += 1
+        frontierLength = queueLength(pqueue)
+        stats.frontierSize(frontierLength)
+        stats.closedSize(len(costDic) - frontierLength) # reached states no longer waiting
+
+    return stats.finish([]) # if it fails, return empty list
+
+def anytimeAStarSearch(problem, heuristic=nullHeuristic, timeLimit=1.0, initialWeight=3.0, weightStep=0.5,
+                       stats=None):
+    """
+    Anytime Repairing A* (ARA*): a weighted A* plan comes back quickly and is
+    improved with smaller and smaller weights until timeLimit seconds have
+    passed or the plan is known to be optimal.
+
+    Each pass orders the frontier by g + weight * h and stops as soon as no
+    queued state could lead to a cheaper goal under that ordering.  States
+    that get cheaper after they were expanded are set aside rather than
+    reopened, and the next pass starts from the frontier plus those states
+    instead of from scratch.  The first plan is always finished, even if
+    that takes longer than timeLimit.
+
+    With an admissible heuristic the returned plan costs at most bound times
+    the optimal cost, where bound is min(weight, plan cost / the lowest
+    g + h of any state still waiting).  It is left on stats.bound and is 1.0
+    once the plan is optimal.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    heuristic = stats.timeHeuristic(heuristic)
+    deadline = stats.startTime + timeLimit
+    infinity = float('inf')
+
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        stats.bound = 1.0
+        return stats.finish([])
+
+    parentsDic = {} # dictionary that has key as state and value as (parent state, action from parent)
+    parentsDic[startState] = None
+
+    costDic = {} # dictionary that has key as state and value as its cheapest known cumulative cost
+    costDic[startState] = 0
+
+    heuristicDic = {} # dictionary that has key as state and value as its heuristic
+    heuristicDic[startState] = heuristic(startState, problem)
+
+    opened = set([startState]) # states waiting in the heap under their current cost
+    closed = set() # states expanded during this pass
+    inconsistent = set() # closed states that got cheaper during this pass
+    heap = []
+    counter = [0] # tie breaker, so equal keys come out first in first out
+
+    def push(state, weight):
+        heapq.heappush(heap, (costDic[state] + weight * heuristicDic[state], counter[0], state, costDic[state]))
+        counter[0] += 1
+
+    best = {'cost': infinity, 'goal': None, 'actions': None}
+
+    def improvePath(weight, interruptible):
+        "Runs one pass; returns False if the deadline cut an interruptible pass short"
+        while heap and heap[0][0] < best['cost']:
+            key, count, state, g = heapq.heappop(heap)
+            if state not in opened or g != costDic[state]:
+                continue # an older entry for a state that has since been re-queued or expanded
+            if interruptible and time.time() > deadline:
+                heapq.heappush(heap, (key, count, state, g))
+                return False
+            opened.remove(state)
+            closed.add(state)
+            for successor, action, stepCost in getSuccessors(state):
+                newCost = g + stepCost
+                if newCost >= costDic.get(successor, infinity):
+                    stats.duplicates += 1
+                    continue
+                costDic[successor] = newCost
+                parentsDic[successor] = (state, action)
+                if problem.isGoalState(successor):
+                    # goals are not expanded: with positive step costs nothing
+                    # past a goal leads to a cheaper one
+                    if newCost < best['cost']:
+                        best['cost'], best['goal'] = newCost, successor
+                        best['actions'] = reconstructPath(parentsDic, successor)
+                elif successor in closed:
+                    inconsistent.add(successor)
+                else:
+                    if successor not in heuristicDic:
+                        heuristicDic[successor] = heuristic(successor, problem)
+                    opened.add(successor)
+                    push(successor, weight)
+            stats.frontierSize(len(opened))
+            stats.closedSize(len(closed))
+        return True
+
+    def lowerBound():
+        """
+        The lowest g + h of any waiting state.  The first state on an optimal
+        path whose cost is not settled is always waiting with its optimal g,
+        so with an admissible heuristic no plan can beat this.
+        """
+        waiting = [costDic[state] + heuristicDic[state] for state in opened | inconsistent]
+        if not waiting:
+            return best['cost'] # nothing left that could lead anywhere cheaper
+        return min(waiting)
+
+    weight = max(1.0, initialWeight)
+    push(startState, weight)
+    boundWeight = None # the weight of the last pass that ended
     while True:
-        if pqueue.isEmpty():
-            return [] # if it fails, return empty list
-        else:
-            currentState = pqueue.pop()
+        # the first pass always ends, so there is a plan and a bound to report
+        finished = improvePath(weight, boundWeight != None)
+        if best['goal'] == None:
+            return stats.finish([]) # if it fails, return empty list
+        if finished:
+            # the weight only holds once a pass has ended, so a pass cut short
+            # keeps the weight of the last pass that ended
+            boundWeight = weight
+        stats.bound = boundWeight
+        lowest = lowerBound()
+        if lowest > 0:
+            stats.bound = max(1.0, min(boundWeight, float(best['cost']) / lowest))
+        if not finished or stats.bound <= 1.0 or weight <= 1.0 or time.time() > deadline:
+            return stats.finish(best['actions'])
 
-            # whenever we reach a new corner, we need to update the heuristic
-            # for all the states that already got in to the pqueue
-            tempList = []
-            while not pqueue.isEmpty():
-                tempList.append(pqueue.pop())
-            for item in tempList:
-                pqueue.push(item, costDic[item] + heuristic(item, problem))
+        # the next pass: lower the weight, requeue the frontier and the
+        # inconsistent states under it and forget what was expanded
+        weight = max(1.0, weight - weightStep)
+        opened |= inconsistent
+        inconsistent.clear()
+        closed.clear()
+        del heap[:]
+        for state in opened:
+            push(state, weight)
 
-            if currentState not in visited:
-                # if we reach the goal, return path
-                if problem.isGoalState(currentState) == True: 
-                   return pathsDic[currentState]
+def bidirectionalBreadthFirstSearch(problem, stats=None):
+    """
+    Breadth first search from the start and the goal at the same time.
 
+    The problem needs a single goal in problem.goal and a getPredecessors
+    method (see PositionSearchProblem).  Each step grows the smaller of the two
+    frontiers by one whole layer.  Every state generated in that layer that
+    the other side has already reached is a meeting point, and once a layer
+    produces any, the one with the fewest total actions is a shortest path.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    start, goal = bidirectionalEndpoints(problem)
+    if start == goal:
+        problem.isGoalState(goal)
+        return stats.finish([])
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    getPredecessors = stats.timeSuccessors(problem.getPredecessors)
+
+    # depth of every reached state on each side, plus the usual parent pointers;
+    # backward parents point toward the goal: (next state, action to get there)
+    forwardDepth, backwardDepth = {start: 0}, {goal: 0}
+    forwardParents, backwardParents = {start: None}, {goal: None}
+    forwardLayer, backwardLayer = [start], [goal]
+
+    while forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            layer, expand, depth, parents, otherDepth = \
+                forwardLayer, getSuccessors, forwardDepth, forwardParents, backwardDepth
+        else:
+            layer, expand, depth, parents, otherDepth = \
+                backwardLayer, getPredecessors, backwardDepth, backwardParents, forwardDepth
+
+        nextLayer = []
+        meeting, meetingLength = None, None
+        for state in layer:
+            for neighbor, action, stepCost in expand(state):
+                if neighbor not in depth:
+                    depth[neighbor] = depth[state] + 1
+                    parents[neighbor] = (state, action)
+                    nextLayer.append(neighbor)
+                    if neighbor in otherDepth:
+                        length = depth[neighbor] + otherDepth[neighbor]
+                        if meeting == None or length < meetingLength:
+                            meeting, meetingLength = neighbor, length
                 else:
-                    triples = problem.getSuccessors(currentState)
-                    # for each triple (successor, action, stepcost) returned from getSuccessors
-                    for triple in triples:
-                        newValue = costDic[currentState] + triple[2] + heuristic(triple[0], problem)
-                        newCost = costDic[currentState] + triple[2]
-                        # If the state is already in queue and we got a more optimal way                        
-                        # to reach the same state, update the priority queue and path dictionary 
-                        # with more optimal path
-                        if not (triple[0] in costDic.keys() and costDic[triple[0]] <= newCost):
-                            costDic[triple[0]] = newCost
-                            pathsDic[triple[0]] = pathsDic[currentState] + [triple[1]]
-                            pqueue.update(triple[0], newValue)
+                    stats.duplicates += 1
+
+        if layer is forwardLayer:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
+        stats.frontierSize(len(forwardLayer) + len(backwardLayer))
+        stats.closedSize(len(forwardDepth) + len(backwardDepth) - len(forwardLayer) - len(backwardLayer))
+
+        if meeting != None:
+            problem.isGoalState(goal) # lets the problem do its goal bookkeeping
+            return stats.finish(joinBidirectionalPath(forwardParents, backwardParents, meeting))
+
+    return stats.finish([]) # if it fails, return empty list
+
+def bidirectionalAStarSearch(problem, heuristic=nullHeuristic, stats=None):
+    """
+    A* from the start and the goal at the same time, with front-to-end
+    heuristics: the forward side estimates the cost to the goal as usual and
+    the backward side calls the same heuristic with the start standing in as
+    the goal.
+
+    Like bidirectionalBreadthFirstSearch it needs problem.goal and
+    getPredecessors.  mu is the cost of the best start-to-goal path seen
+    through a state reached by both sides.  The search stops once mu is no
+    greater than either side's smallest f, or the sum of both sides' smallest
+    g; with an admissible heuristic no cheaper path can remain after that.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    start, goal = bidirectionalEndpoints(problem)
+    if start == goal:
+        problem.isGoalState(goal)
+        return stats.finish([])
+    heuristic = stats.timeHeuristic(heuristic)
+
+    reverseProblem = ReverseHeuristicProblem(problem)
+    forward = SearchFront(start, stats.timeSuccessors(problem.getSuccessors),
+                          lambda state: heuristic(state, problem))
+    backward = SearchFront(goal, stats.timeSuccessors(problem.getPredecessors),
+                           lambda state: heuristic(state, reverseProblem))
+
+    mu, meeting = float('inf'), None
+    while forward.open and backward.open:
+        if mu <= max(forward.minF(), backward.minF(), forward.minG() + backward.minG()):
+            break
+
+        # grow the side with the smaller open list
+        if len(forward.open) <= len(backward.open):
+            side, other = forward, backward
+        else:
+            side, other = backward, forward
+
+        state, g = side.pop()
+        for neighbor, action, stepCost in side.expand(state):
+            newCost = g + stepCost
+            if not side.relax(neighbor, newCost, state, action):
+                stats.duplicates += 1
+            elif neighbor in other.costDic and newCost + other.costDic[neighbor] < mu:
+                mu, meeting = newCost + other.costDic[neighbor], neighbor
+        openStates = len(forward.open) + len(backward.open)
+        stats.frontierSize(openStates)
+        stats.closedSize(len(forward.costDic) + len(backward.costDic) - openStates)
+
+    if meeting == None:
+        return stats.finish([]) # if it fails, return empty list
+    problem.isGoalState(goal) # lets the problem do its goal bookkeeping
+    return stats.finish(joinBidirectionalPath(forward.parentsDic, backward.parentsDic, meeting))
+
+def bidirectionalEndpoints(problem):
+    "Returns (start, goal) for a problem that supports bidirectional search"
+    if not hasattr(problem, 'goal') or not hasattr(problem, 'getPredecessors'):
+        raise Exception, 'Bidirectional search needs a problem with a single goal and getPredecessors'
+    return problem.getStartState(), problem.goal
+
+def joinBidirectionalPath(forwardParents, backwardParents, meeting):
+    "Actions from the start to meeting, followed by the actions from meeting to the goal"
+    actions = reconstructPath(forwardParents, meeting)
+    link = backwardParents[meeting]
+    while link is not None:
+        state, action = link
+        actions.append(action)
+        link = backwardParents[state]
+    return actions
+
+class ReverseHeuristicProblem:
+    """
+    Stands in for a problem when the backward side of a bidirectional search
+    calls a heuristic: goal is the original start state and every other
+    attribute comes from the wrapped problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+class SearchFront:
+    """
+    One side of a bidirectional A*: cheapest known costs, parent pointers and
+    an open list kept in two lazy-deletion heaps, one ordered by f and one by
+    g, so that both termination bounds are available.
+    """
+
+    def __init__(self, root, expand, heuristic):
+        self.expand = expand
+        self.heuristic = heuristic
+        self.costDic = {root: 0} # key is state, value is its cheapest known cost from root
+        self.parentsDic = {root: None} # key is state, value is (previous state, action)
+        self.open = {} # key is open state, value is the g its live heap entries carry
+        self.fHeap, self.gHeap = [], []
+        self.count = 0
+        self.push(root, 0)
+
+    def push(self, state, g):
+        self.open[state] = g
+        heapq.heappush(self.fHeap, (g + self.heuristic(state), self.count, g, state))
+        heapq.heappush(self.gHeap, (g, self.count, g, state))
+        self.count += 1
+
+    def relax(self, state, g, previous, action):
+        "Records a path to state of cost g if it is the cheapest so far; returns whether it was"
+        if state in self.costDic and self.costDic[state] <= g:
+            return False
+        self.costDic[state] = g
+        self.parentsDic[state] = (previous, action)
+        self.push(state, g)
+        return True
+
+    def pop(self):
+        "Removes and returns (state, g) for the open state with the smallest f"
+        self.dropStale(self.fHeap)
+        f, _, g, state = heapq.heappop(self.fHeap)
+        del self.open[state]
+        return state, g
+
+    def minF(self):
+        self.dropStale(self.fHeap)
+        if self.fHeap:
+            return self.fHeap[0][0]
+        return float('inf')
+
+    def minG(self):
+        self.dropStale(self.gHeap)
+        if self.gHeap:
+            return self.gHeap[0][0]
+        return float('inf')
+
+    def dropStale(self, heap):
+        # an entry is stale once its state was popped or re-pushed with a lower g
+        while heap and self.open.get(heap[0][3]) != heap[0][2]:
+            heapq.heappop(heap)
+
+def jumpPointSearch(problem, heuristic=nullHeuristic, stats=None):
+    """
+    Jump Point Search: A* over a 4-connected grid with unit step costs that
+    only puts jump points on the queue.
+
+    The problem must expose walls and a single goal, like PositionSearchProblem
+    with its default cost function.  From each jump point the search runs in a
+    straight line until it hits the goal, a cell with a forced neighbor
+    (an opening beside the line that was blocked one step back), or, when
+    moving vertically, a cell from which a horizontal scan finds such a
+    point.  Corridors and open rooms are then crossed without queueing every
+    cell, and the straight segments between jump points are expanded back
+    into an optimal list of actions at the end.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    heuristic = stats.timeHeuristic(heuristic)
+    walls, goal = problem.walls, problem.goal
+    start = problem.getStartState()
+
+    def walkable(x, y):
+        return 0 <= x < walls.width and 0 <= y < walls.height and not walls[x][y]
+
+    def jumpHorizontal(x, y, dx):
+        # returns the first jump point east (dx=1) or west (dx=-1) of (x, y), or None
+        while True:
+            x += dx
+            if not walkable(x, y):
+                return None
+            if (x, y) == goal:
+                return (x, y)
+            if (walkable(x, y-1) and not walkable(x-dx, y-1)) or \
+               (walkable(x, y+1) and not walkable(x-dx, y+1)):
+                return (x, y)
+
+    def jumpVertical(x, y, dy):
+        # returns the first jump point north (dy=1) or south (dy=-1) of (x, y), or None
+        while True:
+            y += dy
+            if not walkable(x, y):
+                return None
+            if (x, y) == goal:
+                return (x, y)
+            if (walkable(x-1, y) and not walkable(x-1, y-dy)) or \
+               (walkable(x+1, y) and not walkable(x+1, y-dy)):
+                return (x, y)
+            if jumpHorizontal(x, y, 1) != None or jumpHorizontal(x, y, -1) != None:
+                return (x, y)
+
+    def jumpSuccessors(point, parent):
+        # prune to the directions that can't be reached as cheaply through
+        # the parent, then jump along each of them
+        x, y = point
+        if parent == None:
+            directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        elif parent[1] == y:
+            dx = (x > parent[0]) and 1 or -1
+            directions = [(dx, 0), (0, 1), (0, -1)]
+        else:
+            dy = (y > parent[1]) and 1 or -1
+            directions = [(0, dy), (1, 0), (-1, 0)]
+
+        successors = []
+        for dx, dy in directions:
+            if not walkable(x + dx, y + dy):
+                continue
+            if dx != 0:
+                jumpPoint = jumpHorizontal(x, y, dx)
+            else:
+                jumpPoint = jumpVertical(x, y, dy)
+            if jumpPoint != None:
+                successors.append((jumpPoint, abs(jumpPoint[0] - x) + abs(jumpPoint[1] - y)))
+        return successors
+
+    jumpSuccessors = stats.timeSuccessors(jumpSuccessors)
+    pqueue = LazyPriorityQueue()
+    pqueue.push(start, heuristic(start, problem))
+    parentsDic = {start: None} # key is jump point, value is the jump point it was reached from
+    costDic = {start: 0}
+    closed = set([])
+
+    while not pqueue.isEmpty():
+        currentPoint = pqueue.pop()
+        if currentPoint in closed:
+            continue
+        closed.add(currentPoint)
+
+        if problem.isGoalState(currentPoint):
+            actions = []
+            while parentsDic[currentPoint] != None:
+                parent = parentsDic[currentPoint]
+                dx, dy = currentPoint[0] - parent[0], currentPoint[1] - parent[1]
+                step = game.Actions.vectorToDirection((cmp(dx, 0), cmp(dy, 0)))
+                actions[:0] = [step] * (abs(dx) + abs(dy))
+                currentPoint = parent
+            return stats.finish(actions)
+
+        if hasattr(problem, '_expanded'):
+            problem._expanded += 1 # keep SearchAgent's expanded count meaningful
+        for jumpPoint, distance in jumpSuccessors(currentPoint, parentsDic[currentPoint]):
+            newCost = costDic[currentPoint] + distance
+            if jumpPoint not in closed and (jumpPoint not in costDic or newCost < costDic[jumpPoint]):
+                costDic[jumpPoint] = newCost
+                parentsDic[jumpPoint] = currentPoint
+                pqueue.update(jumpPoint, newCost + heuristic(jumpPoint, problem))
+            else:
+                stats.duplicates += 1
+        stats.frontierSize(len(pqueue))
+        stats.closedSize(len(closed))
+
+    return stats.finish([]) # if it fails, return empty list
+
+def bitboardBreadthFirstSearch(problem, stats=None):
+    """
+    Breadth first search that advances a whole layer of cells per step, using
+    searchAgents.BitboardMaze.
+
+    The problem must expose walls, a position as its start state and
+    goalPositions(), like PositionSearchProblem and AnyFoodSearchProblem.
+    Step costs are ignored, as in breadthFirstSearch.  Every cell in a layer
+    that was advanced counts as expanded.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    maze = searchAgents.getBitboardMaze(problem.walls)
+    goalMask = maze.mask(problem.goalPositions())
+    layers = maze.layers(problem.getStartState(), goalMask)
+
+    cells = [bin(layer).count('1') for layer in layers]
+    stats.expanded = sum(cells[:-1])
+    stats.generated = sum(cells) - 1
+    stats.peakFrontier = max(cells)
+    stats.peakClosed = sum(cells)
+    problem._expanded += stats.expanded
+
+    reached = layers[-1] & goalMask
+    if not reached:
+        return stats.finish([]) # if it fails, return empty list
+    return stats.finish(maze.backtrack(layers, reached & -reached))
+
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic, stats=None):
+    """
+    IDA*: repeated depth first searches that cut off every path whose f
+    exceeds a bound, raising the bound to the smallest f that was cut off
+    each round.  Only the current path is kept in memory, so big
+    FoodSearchProblems cost time rather than RAM.  States already on the
+    current path are skipped to avoid cycles.
+    """
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    heuristic = stats.timeHeuristic(heuristic)
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return stats.finish([])
+    bound = heuristic(startState, problem)
+
+    while bound != float('inf'):
+        nextBound = float('inf')
+        statesOnPath = set([startState])
+        actions = []
+        # each frame is [state, cost to reach it, its successors, next successor to try]
+        stack = [[startState, 0, getSuccessors(startState), 0]]
+        while stack:
+            frame = stack[-1]
+            state, g, triples, i = frame
+            if i == len(triples):
+                stack.pop()
+                statesOnPath.discard(state)
+                if stack:
+                    actions.pop()
+                continue
+            frame[3] += 1
+
+            successor, action, stepCost = triples[i]
+            if successor in statesOnPath:
+                stats.duplicates += 1
+                continue
+            newCost = g + stepCost
+            f = newCost + heuristic(successor, problem)
+            if f > bound:
+                nextBound = min(nextBound, f)
+                continue
+
+            actions.append(action)
+            if problem.isGoalState(successor):
+                return stats.finish(actions)
+            statesOnPath.add(successor)
+            stack.append([successor, newCost, getSuccessors(successor), 0])
+            stats.frontierSize(len(stack)) # the frames still holding untried successors
+            stats.closedSize(len(statesOnPath))
+        bound = nextBound
+
+    return stats.finish([]) # if it fails, return empty list
+
+def simplifiedMemoryBoundedAStarSearch(problem, heuristic=nullHeuristic, maxNodes=50000, stats=None):
+    """
+    SMA*: A* that never holds more than maxNodes search nodes.
+
+    Works like A* on a search tree until memory is full.  Then the shallowest
+    leaf with the highest f is dropped and its f is remembered by its parent,
+    which goes back on the open list so the forgotten branch can be
+    regenerated if it becomes the best option again.  f values are backed up
+    from children to parents, so a parent always knows the best f under it.
+    A node too deep to keep its whole path within maxNodes gets an infinite
+    f.  The result is the optimal plan if one fits in the budget, otherwise
+    [] once every remaining option has infinite f.  A budget close to the
+    plan length works but thrashes, regenerating the same branches many
+    times over.
+    """
+    if maxNodes < 2:
+        raise Exception, 'SMA* needs room for at least two nodes'
+    stats = (stats or SearchStats()).start(problem)
+    getSuccessors = stats.timeSuccessors(problem.getSuccessors)
+    heuristic = stats.timeHeuristic(heuristic)
+    infinity = float('inf')
+    startState = problem.getStartState()
+    root = SMANode(startState, None, None, 0, heuristic(startState, problem))
+    frontier = SMAFrontier()
+    frontier.refresh(root)
+    nodesInMemory = 1
+
+    while True:
+        node = frontier.best()
+        if node == None or node.f == infinity:
+            return stats.finish([]) # nothing left that fits in memory
+
+        if not node.expanded and problem.isGoalState(node.state):
+            return stats.finish(node.actions())
+
+        # generate every successor not currently in memory: all of them the
+        # first time, afterwards only the ones that were forgotten
+        for successor, action, stepCost in getSuccessors(node.state):
+            if action in node.children or (node.expanded and action not in node.forgotten):
+                continue
+            if node.onPath(successor):
+                stats.duplicates += 1
+                continue
+            child = SMANode(successor, node, action, node.g + stepCost, 0)
+            if action in node.forgotten:
+                child.f = node.forgotten.pop(action)
+            elif child.depth + 1 >= maxNodes and not problem.isGoalState(successor):
+                child.f = infinity
+            else:
+                child.f = max(node.f, child.g + heuristic(successor, problem))
+            node.children[action] = child
+            frontier.refresh(child)
+            nodesInMemory += 1
+        stats.frontierSize(nodesInMemory) # SMA* keeps its whole tree as the frontier
+        node.expanded = True
+        node.forgotten.clear() # anything still forgotten was a cycle on this path
+
+        # back the best child f up through the ancestors
+        current = node
+        while current != None:
+            values = [child.f for child in current.children.values()] + current.forgotten.values()
+            newF = infinity
+            if values:
+                newF = min(values)
+            if newF == current.f and current is not node:
+                break
+            current.f = newF
+            frontier.refresh(current)
+            current = current.parent
+
+        # drop the worst leaves until the budget holds again
+        while nodesInMemory > maxNodes:
+            leaf = frontier.worstLeaf()
+            parent = leaf.parent
+            del parent.children[leaf.action]
+            parent.forgotten[leaf.action] = leaf.f
+            leaf.forget()
+            nodesInMemory -= 1
+            frontier.refresh(parent)
+
+class SMANode:
+    """
+    A search tree node for SMA*.  children holds the successors in memory,
+    keyed by action, and forgotten the backed-up f of successors that were
+    dropped to save memory.
+    """
+
+    def __init__(self, state, parent, action, g, f):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.g = g
+        self.f = f
+        self.depth = parent != None and parent.depth + 1 or 0
+        self.children = {}
+        self.forgotten = {}
+        self.expanded = False
+        self.alive = True
+        self.version = 0
+
+    def isOpen(self):
+        "Whether the node still has successors to generate"
+        return self.alive and (not self.expanded or len(self.forgotten) > 0)
+
+    def isLeaf(self):
+        "Whether the node can be dropped: it has no children in memory and is not the root"
+        return self.alive and self.parent != None and len(self.children) == 0
+
+    def openF(self):
+        if self.children:
+            return min(self.forgotten.values())
+        return self.f
+
+    def onPath(self, state):
+        node = self
+        while node != None:
+            if node.state == state:
+                return True
+            node = node.parent
+        return False
+
+    def actions(self):
+        actions = []
+        node = self
+        while node.parent != None:
+            actions.append(node.action)
+            node = node.parent
+        actions.reverse()
+        return actions
+
+    def forget(self):
+        self.alive = False
+        self.parent = None
+
+class SMAFrontier:
+    """
+    The two orders SMA* needs over its nodes, kept as lazy heaps: open nodes
+    by lowest f then deepest, and leaves by highest f then shallowest.  Call
+    refresh whenever a node's f or children change; older heap entries for it
+    are then ignored.
+    """
+
+    def __init__(self):
+        self.openHeap = []
+        self.leafHeap = []
+        self.count = 0
+        self.compactAt = 4096
+
+    def refresh(self, node):
+        node.version += 1
+        if node.isOpen():
+            heapq.heappush(self.openHeap, (node.openF(), -node.depth, self.count, node.version, node))
+        if node.isLeaf():
+            heapq.heappush(self.leafHeap, (-node.f, node.depth, self.count, node.version, node))
+        self.count += 1
+
+    def best(self):
+        self.openHeap = self.compact(self.openHeap, SMANode.isOpen)
+        while self.openHeap:
+            entry = self.openHeap[0]
+            if entry[3] == entry[4].version and entry[4].isOpen():
+                return entry[4]
+            heapq.heappop(self.openHeap)
+        return None
+
+    def worstLeaf(self):
+        self.leafHeap = self.compact(self.leafHeap, SMANode.isLeaf)
+        while True:
+            entry = heapq.heappop(self.leafHeap)
+            if entry[3] == entry[4].version and entry[4].isLeaf():
+                return entry[4]
+
+    def compact(self, heap, isValid):
+        # stale entries keep dropped nodes reachable, so once they pile up the
+        # heap is rebuilt from the live entries alone
+        if len(heap) <= self.compactAt:
+            return heap
+        heap = [entry for entry in heap if entry[3] == entry[4].version and isValid(entry[4])]
+        heapq.heapify(heap)
+        self.compactAt = max(4096, 2 * len(heap))
+        return heap
+
+#################
+# Search queues #
+#################
+
+class LazyPriorityQueue:
+    """
+    A priority queue with the util.PriorityQueue interface built directly on
+    heapq.  Lowering an item's priority pushes a new entry and leaves the old
+    one in the heap; pop discards entries that are no longer the item's
+    current one.  Ties pop in insertion order.
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.live = {} # key is item, value is (priority, count) of its current entry
+        self.count = 0
+
+    def push(self, item, priority):
+        heapq.heappush(self.heap, (priority, self.count, item))
+        self.live[item] = (priority, self.count)
+        self.count += 1
+
+    def pop(self):
+        while True:
+            priority, count, item = heapq.heappop(self.heap)
+            current = self.live.get(item)
+            if current is not None and current[1] == count:
+                del self.live[item]
+                return item
+
+    def isEmpty(self):
+        return len(self.live) == 0
+
+    def update(self, item, priority):
+        # same contract as util.PriorityQueue.update: lower the priority of a
+        # queued item, or push it if it is not queued
+        current = self.live.get(item)
+        if current is None or priority < current[0]:
+            self.push(item, priority)
+
+    def __len__(self):
+        return len(self.live)
+
+    def __contains__(self, item):
+        return item in self.live
+
+class IndexedPriorityQueue:
+    """
+    A binary heap that keeps the heap position of every item in a dictionary,
+    so update (decrease-key) finds the item in O(1) and re-sifts it in
+    O(log n) instead of scanning and re-heapifying like
+    util.PriorityQueue.update.  Ties pop in insertion order.
+    """
+
+    def __init__(self):
+        self.heap = [] # entries are [priority, count, item]
+        self.positions = {} # key is item, value is the index of its entry in heap
+        self.count = 0
+
+    def push(self, item, priority):
+        # pushing an item that is already queued re-keys it
+        if item in self.positions:
+            pos = self.positions[item]
+            self.heap[pos][0] = priority
+            self._siftUp(pos)
+            self._siftDown(self.positions[item])
+            return
+        self.heap.append([priority, self.count, item])
+        self.count += 1
+        self.positions[item] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            top = heap[0]
+            heap[0] = last
+            self.positions[last[2]] = 0
+            self._siftDown(0)
+        else:
+            top = last
+        del self.positions[top[2]]
+        return top[2]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def update(self, item, priority):
+        # same contract as util.PriorityQueue.update: lower the priority of a
+        # queued item, or push it if it is not queued
+        pos = self.positions.get(item)
+        if pos is None:
+            self.push(item, priority)
+        elif priority < self.heap[pos][0]:
+            self.heap[pos][0] = priority
+            self._siftUp(pos)
+
+    def priority(self, item):
+        return self.heap[self.positions[item]][0]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def _siftUp(self, pos):
+        heap, positions = self.heap, self.positions
+        entry = heap[pos]
+        while pos > 0:
+            parentPos = (pos - 1) >> 1
+            parent = heap[parentPos]
+            if not entry < parent:
+                break
+            heap[pos] = parent
+            positions[parent[2]] = pos
+            pos = parentPos
+        heap[pos] = entry
+        positions[entry[2]] = pos
 
+    def _siftDown(self, pos):
+        heap, positions = self.heap, self.positions
+        size = len(heap)
+        entry = heap[pos]
+        childPos = 2 * pos + 1
+        while childPos < size:
+            rightPos = childPos + 1
+            if rightPos < size and heap[rightPos] < heap[childPos]:
+                childPos = rightPos
+            child = heap[childPos]
+            if not child < entry:
+                break
+            heap[pos] = child
+            positions[child[2]] = pos
+            pos = childPos
+            childPos = 2 * pos + 1
+        heap[pos] = entry
+        positions[entry[2]] = pos
 
 
 # Abbreviations
@@ -255,3 +1367,11 @@ bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
+jps = jumpPointSearch
+bbfs = bitboardBreadthFirstSearch
+batchbfs = batchBreadthFirstSearch
+arastar = anytimeAStarSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = simplifiedMemoryBoundedAStarSearch
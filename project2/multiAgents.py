@@ -14,9 +14,209 @@
 
 from util import manhattanDistance
 from game import Directions
-import random, util, math
+import random, util, math, time, collections
 from game import Agent
 
+class MazeDistances:
+    """
+      Walls and maze distances for one layout, shared by every agent in this
+      file (see getMazeDistances).
+
+      The open cells and their moves are tabled once, so isOpen is a set
+      lookup instead of a scan of getWalls().asList().  A BFS from a source
+      cell is run once and its distance field kept, so later questions about
+      the same source are dictionary lookups.  At most maxFields fields are
+      kept; when that many are stored the cache starts over.
+    """
+
+    def __init__(self, walls, maxFields=1000):
+        self.walls = walls
+        self.maxFields = maxFields
+        self.openCells = set([(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]])
+        self.moves = {} # dictionary that has key as open cell and value as list of (neighbor, direction)
+        for (x, y) in self.openCells:
+            neighbors = [((x-1, y), Directions.WEST), ((x+1, y), Directions.EAST),
+                         ((x, y+1), Directions.NORTH), ((x, y-1), Directions.SOUTH)]
+            self.moves[(x, y)] = [(neighbor, direction) for neighbor, direction in neighbors if neighbor in self.openCells]
+        self.fields = {} # dictionary that has key as source cell and value as its distance field
+        self.fieldsBuilt = 0
+        self.neighborhoodSizes = {} # dictionary that has key as (cell, radius) and value as number of cells that close
+
+    def isOpen(self, position):
+        """ returns true if position is on the board and not a wall """
+        return position in self.openCells
+
+    def getSuccessors(self, position):
+        """ returns the (neighbor, direction) pairs reachable from position in one move """
+        return self.moves.get(util.nearestPoint(position), [])
+
+    def distanceField(self, source):
+        """ returns a dictionary from every cell reachable from source to its maze distance """
+        source = util.nearestPoint(source)
+        field = self.fields.get(source)
+        if field != None:
+            return field
+        field = {}
+        if source in self.openCells:
+            field[source] = 0
+            layer, distance = [source], 0
+            while layer:
+                distance += 1
+                nextLayer = []
+                for position in layer:
+                    for neighbor, direction in self.moves[position]:
+                        if neighbor not in field:
+                            field[neighbor] = distance
+                            nextLayer.append(neighbor)
+                layer = nextLayer
+        if len(self.fields) >= self.maxFields:
+            self.fields = {}
+        self.fields[source] = field
+        self.fieldsBuilt += 1
+        return field
+
+    def distance(self, start, goal):
+        """ returns the maze distance between two positions, or None if goal can't be reached """
+        return self.distanceField(start).get(util.nearestPoint(goal))
+
+    def closest(self, start, goals):
+        """ returns (goal, distance) for the nearest of goals, or (None, None) if none can be reached """
+        field = self.distanceField(start)
+        best, bestDistance = None, None
+        for goal in goals:
+            distance = field.get(util.nearestPoint(goal))
+            if distance != None and (bestDistance == None or distance < bestDistance):
+                best, bestDistance = goal, distance
+        return best, bestDistance
+
+    def neighborhoodSize(self, position, radius):
+        """ returns the number of open cells within radius moves of position, position included """
+        key = (util.nearestPoint(position), radius)
+        if key not in self.neighborhoodSizes:
+            self.neighborhoodSizes[key] = len([1 for distance in self.distanceField(key[0]).itervalues() if distance <= radius])
+        return self.neighborhoodSizes[key]
+
+    def path(self, start, goal):
+        """ returns a shortest list of directions from start to goal, or None if goal can't be reached """
+        field = self.distanceField(start)
+        position = util.nearestPoint(goal)
+        if position not in field:
+            return None
+        actions = []
+        while field[position] > 0:
+            for neighbor, direction in self.moves[position]:
+                if field.get(neighbor) == field[position] - 1:
+                    actions.append(Directions.REVERSE[direction])
+                    position = neighbor
+                    break
+        actions.reverse()
+        return actions
+
+_mazeDistances = collections.OrderedDict() # key is id(walls), value is (walls, MazeDistances); oldest use first
+
+def getMazeDistances(gameState):
+    """
+      Returns the MazeDistances for gameState's layout.  Every state of a game
+      shares one walls Grid, so after the first call this is a single lookup.
+      Only the 8 layouts used most recently are kept.
+    """
+    walls = gameState.getWalls()
+    entry = _mazeDistances.pop(id(walls), None)
+    if entry == None or entry[0] is not walls:
+        entry = (walls, MazeDistances(walls))
+    _mazeDistances[id(walls)] = entry # mark as most recently used
+    if len(_mazeDistances) > 8:
+        _mazeDistances.popitem(last=False)
+    return entry[1]
+
+_foodLists = {} # key is id(food.data), value is (food.data, list of food positions)
+
+def foodList(food):
+    """
+      Returns food.asList() for a food Grid.  The game copies the food grid
+      before eating from it, so states that have eaten the same food share one
+      grid and the list is only built once for all of them.
+    """
+    entry = _foodLists.get(id(food.data))
+    if entry == None or entry[0] is not food.data:
+        if len(_foodLists) >= 10000:
+            _foodLists.clear()
+        entry = (food.data, food.asList())
+        _foodLists[id(food.data)] = entry
+    return entry[1]
+
+def minOrNone(values):
+    if len(values) == 0: return None
+    return min(values)
+
+def maxOrNone(values):
+    if len(values) == 0: return None
+    return max(values)
+
+def extractFeatures(gameState, densityRadius=3):
+    """
+      Returns a dictionary of the features the evaluation functions in this
+      file are built from, all measured in maze distance from Pacman with a
+      single cached BFS field (see MazeDistances):
+
+        pacman, food, numFood, capsules, numCapsules
+        nearestFood, farthestFood, nearestCapsule
+        ghostDistances, scaredTimes      one entry per ghost
+        nearestGhost                     over every ghost
+        nearestActiveGhost               over ghosts that are not scared
+        nearestScaredGhost               over scared ghosts Pacman can reach in time
+        foodDensity                      fraction of the cells within densityRadius holding food
+
+      A distance is None when there is nothing of that kind to reach.
+    """
+    features = extractPacmanFeatures(gameState, densityRadius)
+    features.update(extractGhostFeatures(gameState))
+    return features
+
+def extractPacmanFeatures(gameState, densityRadius=3):
+    """
+      The features of extractFeatures that only depend on Pacman's position,
+      the food and the capsules, so states that differ only in their ghosts
+      can share them.
+    """
+    pacman = gameState.getPacmanPosition()
+    distances = getMazeDistances(gameState)
+    field = distances.distanceField(pacman)
+    features = {'pacman': pacman}
+
+    food = foodList(gameState.getFood())
+    foodDistances = [field[position] for position in food if position in field]
+    features['food'] = food
+    features['numFood'] = len(food)
+    features['nearestFood'] = minOrNone(foodDistances)
+    features['farthestFood'] = maxOrNone(foodDistances)
+    nearby = len([1 for distance in foodDistances if distance <= densityRadius])
+    features['foodDensity'] = float(nearby) / distances.neighborhoodSize(pacman, densityRadius)
+
+    capsules = gameState.getCapsules()
+    capsuleDistances = [field[position] for position in capsules if position in field]
+    features['capsules'] = capsules
+    features['numCapsules'] = len(capsules)
+    features['nearestCapsule'] = minOrNone(capsuleDistances)
+    return features
+
+def extractGhostFeatures(gameState):
+    """ The ghost features of extractFeatures """
+    field = getMazeDistances(gameState).distanceField(gameState.getPacmanPosition())
+    features = {}
+    ghostStates = gameState.getGhostStates()
+    ghostDistances = [field.get(util.nearestPoint(ghostState.getPosition())) for ghostState in ghostStates]
+    scaredTimes = [ghostState.scaredTimer for ghostState in ghostStates]
+    features['ghostDistances'] = ghostDistances
+    features['scaredTimes'] = scaredTimes
+    reachable = [(distance, scaredTime) for distance, scaredTime in zip(ghostDistances, scaredTimes) if distance != None]
+    features['nearestGhost'] = minOrNone([distance for distance, scaredTime in reachable])
+    active = [distance for distance, scaredTime in reachable if scaredTime == 0]
+    features['nearestActiveGhost'] = minOrNone(active)
+    scared = [distance for distance, scaredTime in reachable if 0 < distance < scaredTime]
+    features['nearestScaredGhost'] = minOrNone(scared)
+    return features
+
 class ReflexAgent(Agent):
     """
       A reflex agent chooses an action at each choice point by examining
@@ -52,37 +252,12 @@ class ReflexAgent(Agent):
 
     def bfs(self, currentPacmanPos, goalPositions, currentGameState):
         """ this function returns the distance and the location of closest 'goal' which is a list of 
-            tuples that represent a location """
-        startingPos = currentPacmanPos
-        queue = util.Queue()
-        queue.push(startingPos)
-
-        visited = set([])
-
-        pathsDic = {} # dictionary that has key as state and value as the path to key state
-        pathsDic[startingPos] = []
-
-        while True:
-            if queue.isEmpty():
-                return (0,0), []  # if it fails, return empty list
-            else:
-                currentPos = queue.pop()
-                if currentPos in visited:
-                    continue
-
-                else:
-                    visited.add(currentPos)
-                    if currentPos in goalPositions:
-                      return currentPos, pathsDic[currentPos]
-
-                    else:
-                      wallList = currentGameState.getWalls().asList()
-                      successors = self.getSuccessors(currentPos, wallList, currentGameState.getWalls())
-                      for successor in successors:
-                        successorPos = (successor[0], successor[1])
-                        queue.push(successorPos)
-                        if successorPos not in pathsDic.keys():
-                            pathsDic[successorPos] = pathsDic[currentPos] + [successor[-1]]
+            tuples that represent a location.  The BFS itself is cached per layout by MazeDistances """
+        distances = getMazeDistances(currentGameState)
+        closestPos, distance = distances.closest(currentPacmanPos, goalPositions)
+        if closestPos == None:
+            return (0,0), []  # if it fails, return empty list
+        return closestPos, distances.path(currentPacmanPos, closestPos)
 
     def gridToList(self, grid):
         """ this returns a list of positions of stuff in stuffGrid (substitute stuff to either food/wall)"""
@@ -103,9 +278,8 @@ class ReflexAgent(Agent):
 
     
     def isValidPos(self, x, y, wallList, grid):
-        """ returns true if the position is valid in grid, and not a wall """
-        if (x, y) not in wallList:
-          return x > 0 and x < grid.width and y > 0 and y < grid.height
+        """ returns true if the position is valid in grid, and not a wall (wallList is no longer needed) """
+        return x > 0 and x < grid.width and y > 0 and y < grid.height and not grid[x][y]
 
     def evaluationFunction(self, currentGameState, action):
         """
@@ -158,6 +332,141 @@ def scoreEvaluationFunction(currentGameState):
     """
     return currentGameState.getScore()
 
+class ZobristKeys:
+    """
+      Zobrist hashing of game states for the transposition table.
+
+      Every feature of a state (whose turn it is, Pacman's position, each
+      ghost's position, direction and scared timer, each food and capsule,
+      the score) gets a random 64 bit key the first time it is seen, and a
+      state's hash is the xor of the keys of its features.  childHash updates
+      a parent's hash with only the features one move can change, so hashing
+      a node costs O(ghosts) instead of a pass over the food grid.
+    """
+
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.keys = {} # dictionary that has key as a feature tuple and value as its random key
+
+    def key(self, feature):
+        key = self.keys.get(feature)
+        if key == None:
+            key = self.random.getrandbits(64)
+            self.keys[feature] = key
+        return key
+
+    def ghostFeature(self, ghostIndex, ghostState):
+        # a ghost may not reverse, so its direction decides its legal moves
+        return ('ghost', ghostIndex, ghostState.getPosition(), ghostState.getDirection(), ghostState.scaredTimer)
+
+    def hashState(self, gameState, agentIndex):
+        """ the hash of gameState with agentIndex to move, built from scratch """
+        key = self.key(('turn', agentIndex)) ^ self.key(('pacman', gameState.getPacmanPosition()))
+        key ^= self.key(('score', gameState.getScore()))
+        for position in foodList(gameState.getFood()):
+            key ^= self.key(('food', position))
+        for position in gameState.getCapsules():
+            key ^= self.key(('capsule', position))
+        for ghostIndex, ghostState in enumerate(gameState.getGhostStates()):
+            key ^= self.key(self.ghostFeature(ghostIndex, ghostState))
+        return key
+
+    def childHash(self, key, parent, child, agentIndex, nextAgent):
+        """ the hash of child, reached by agentIndex moving in parent, from the hash of parent """
+        key ^= self.key(('turn', agentIndex)) ^ self.key(('turn', nextAgent))
+        if agentIndex == 0:
+            oldPosition, newPosition = parent.getPacmanPosition(), child.getPacmanPosition()
+            key ^= self.key(('pacman', oldPosition)) ^ self.key(('pacman', newPosition))
+            x, y = newPosition
+            if parent.hasFood(x, y) and not child.hasFood(x, y):
+                key ^= self.key(('food', newPosition))
+            if newPosition in parent.getCapsules():
+                key ^= self.key(('capsule', newPosition))
+        # a capsule or a collision changes other ghosts than the one that moved
+        for ghostIndex, (old, new) in enumerate(zip(parent.getGhostStates(), child.getGhostStates())):
+            oldFeature, newFeature = self.ghostFeature(ghostIndex, old), self.ghostFeature(ghostIndex, new)
+            if oldFeature != newFeature:
+                key ^= self.key(oldFeature) ^ self.key(newFeature)
+        if parent.getScore() != child.getScore():
+            key ^= self.key(('score', parent.getScore())) ^ self.key(('score', child.getScore()))
+        return key
+
+class TranspositionTable:
+    """
+      Values of searched nodes keyed by Zobrist hash.  Within one search they
+      answer transpositions, nodes reached again by another order of moves.
+      The table is kept across getAction calls, but the next move's search
+      needs each node one round deeper than this move searched it, so old
+      values are rarely deep enough to use.  What carries over is the best
+      actions, which only AlphaBetaAgent's iterative deepening uses to order
+      moves.  ExpectimaxAgent keeps its leaf values separately, and those are
+      reused across moves.
+
+      Each entry is (depth, flag, value, action, generation), where depth is
+      the number of agent moves searched below the node, flag says whether
+      value is EXACT or only a LOWER or UPPER bound (alpha-beta), and action
+      is the best move found there.  An entry is only used for a search at
+      most as deep as its own.  A store keeps the existing entry if it is
+      deeper and from the current search.  When the table holds maxEntries,
+      entries from earlier searches are dropped first, then the shallowest.
+
+      probes and hits count lookups and lookups that found a deep enough
+      entry; a bound found by alpha-beta can still be too loose to cut.
+    """
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, maxEntries=100000):
+        self.maxEntries = maxEntries
+        self.entries = {} # dictionary that has key as hash and value as entry tuple
+        self.generation = 0
+        self.probes, self.hits, self.stores, self.evicted = 0, 0, 0, 0
+
+    def newSearch(self):
+        """ call at the start of every getAction """
+        self.generation += 1
+
+    def lookup(self, key, depth):
+        """ returns the entry for key if it was searched at least depth deep, otherwise None """
+        self.probes += 1
+        entry = self.entries.get(key)
+        if entry != None and entry[0] >= depth:
+            self.hits += 1
+            return entry
+        return None
+
+    def bestAction(self, key):
+        """ the best action stored for key at any depth, or None """
+        entry = self.entries.get(key)
+        if entry == None: return None
+        return entry[3]
+
+    def store(self, key, depth, flag, value, action=None):
+        old = self.entries.get(key)
+        if old != None and old[0] > depth and old[4] == self.generation:
+            return
+        if old == None and len(self.entries) >= self.maxEntries:
+            self.prune()
+        self.entries[key] = (depth, flag, value, action, self.generation)
+        self.stores += 1
+
+    def prune(self):
+        """ frees a quarter of the table: entries from earlier searches first, then the shallowest """
+        target = self.maxEntries * 3 / 4
+        size = len(self.entries)
+        self.entries = dict([(key, entry) for key, entry in self.entries.iteritems() if entry[4] == self.generation])
+        if len(self.entries) > target:
+            ranked = sorted(self.entries.iteritems(), key=lambda item: -item[1][0])
+            self.entries = dict(ranked[:target])
+        self.evicted += size - len(self.entries)
+
+    def hitRate(self):
+        if self.probes == 0: return 0.0
+        return float(self.hits) / self.probes
+
+    def __str__(self):
+        return '%d entries, %d probes, %d hits (%.1f%%), %d stores, %d evicted' % \
+            (len(self.entries), self.probes, self.hits, 100 * self.hitRate(), self.stores, self.evicted)
+
 class MultiAgentSearchAgent(Agent):
     """
       This class provides some common elements to all of your
@@ -171,12 +480,54 @@ class MultiAgentSearchAgent(Agent):
       Note: this is an abstract class: one that should not be instantiated.  It's
       only partially specified, and designed to be extended.  Agent (game.py)
       is another abstract class.
+
+      Maze distances for the layout come from getMazeDistances(gameState),
+      the same cache ReflexAgent uses.
+
+      Searched nodes go in a TranspositionTable of up to tableSize entries
+      that lives as long as the agent (see TranspositionTable for what that
+      buys across moves); tableSize=0 searches without one.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '100000'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        self.zobrist = ZobristKeys()
+        self.table = None
+        if int(tableSize) > 0:
+            self.table = TranspositionTable(int(tableSize))
+
+    def startSearch(self, gameState):
+        """ readies the table for a new getAction and returns the root's hash (None without a table) """
+        if self.table == None:
+            return None
+        self.table.newSearch()
+        return self.zobrist.hashState(gameState, self.index)
+
+    def lookup(self, key, depth):
+        if self.table == None: return None
+        return self.table.lookup(key, depth)
+
+    def store(self, key, depth, flag, value, action=None):
+        if self.table != None:
+            self.table.store(key, depth, flag, value, action)
+
+    def successors(self, gameState, agentIndex, key, actions=None):
+        """
+          yields (action, successor, successor's hash) for every legal action of
+          agentIndex, or for actions in that order when they are given.  Without
+          a table nothing is hashed and every hash is None.
+        """
+        if actions == None:
+            actions = gameState.getLegalActions(agentIndex)
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        for action in actions:
+            successor = gameState.generateSuccessor(agentIndex, action)
+            if self.table == None:
+                yield action, successor, None
+            else:
+                yield action, successor, self.zobrist.childHash(key, gameState, successor, agentIndex, nextAgent)
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -206,26 +557,215 @@ class MinimaxAgent(MultiAgentSearchAgent):
           gameState.isLose():
             Returns whether or not the game state is a losing state
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        key = self.startSearch(gameState)
+        value, action = self.minimax(gameState, self.index, self.depth * gameState.getNumAgents(), key)
+        return action
+
+    def minimax(self, gameState, agentIndex, depth, key):
+        """ returns (value, action) of gameState with agentIndex to move and depth agent moves left """
+        if depth == 0 or gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState), None
+        entry = self.lookup(key, depth)
+        if entry != None:
+            return entry[2], entry[3]
+
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        bestValue, bestAction = None, None
+        for action, successor, successorKey in self.successors(gameState, agentIndex, key):
+            value = self.minimax(successor, nextAgent, depth - 1, successorKey)[0]
+            if bestValue == None or (agentIndex == 0 and value > bestValue) or (agentIndex != 0 and value < bestValue):
+                bestValue, bestAction = value, action
+        if bestValue == None:
+            return self.evaluationFunction(gameState), None # no legal moves
+        self.store(key, depth, TranspositionTable.EXACT, bestValue, bestAction)
+        return bestValue, bestAction
+
+class SearchTimeout(Exception):
+    "Raised inside a search when the agent's deadline for the move has passed"
+    pass
 
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
       Your minimax agent with alpha-beta pruning (question 3)
+
+      With timeLimit (seconds per move) set, getAction ignores depth and
+      deepens one round of moves at a time until the time is up, returning
+      the best action of the deepest search that finished.  The first round
+      always finishes.  Moves are then ordered by the table's best action,
+      then two killer moves per ply (moves that caused a cutoff at that ply),
+      then the history heuristic (cutoffs per agent and action, weighted by
+      the depth left); the root is ordered by the previous round's values.
+      Without timeLimit moves are searched in legal-action order, so ties
+      and node counts are the same as before.
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '100000', timeLimit = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, tableSize)
+        self.timeLimit = float(timeLimit)
+        self.deadline = None
+        self.killers = {} # dictionary that has key as ply and value as up to two actions that caused cutoffs there
+        self.history = {} # dictionary that has key as (agentIndex, action) and value as its cutoff score
+        self.completedDepth = 0 # rounds of moves the last getAction finished
+        self.reachedHorizon = False # whether the current round stopped anywhere short of the game's end
+
     def getAction(self, gameState):
         """
           Returns the minimax action using self.depth and self.evaluationFunction
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        key = self.startSearch(gameState)
+        self.killers = {}
+        for move in self.history:
+            self.history[move] /= 2 # older cutoffs count for less
+        if self.timeLimit > 0:
+            return self.iterativeDeepening(gameState, key)
+        self.deadline = None
+        value, action = self.alphaBeta(gameState, self.index, self.depth * gameState.getNumAgents(),
+                                       key, -float('inf'), float('inf'))
+        self.completedDepth = self.depth
+        return action
+
+    def iterativeDeepening(self, gameState, key):
+        """ searches 1, 2, 3, ... rounds of moves deep until the deadline and returns the last finished best action """
+        deadline = time.time() + self.timeLimit
+        numAgents = gameState.getNumAgents()
+        rootActions = gameState.getLegalActions(self.index)
+        bestAction, depth = None, 1
+        self.completedDepth = 0
+        while True:
+            self.deadline = None # the first round always finishes
+            if depth > 1: self.deadline = deadline
+            self.reachedHorizon = False
+            try:
+                action, rootValues = self.searchRoot(gameState, key, depth * numAgents, rootActions)
+            except SearchTimeout:
+                break
+            bestAction, self.completedDepth = action, depth
+            rootActions = sorted(rootActions, key=lambda action: -rootValues[action])
+            if not self.reachedHorizon or time.time() >= deadline:
+                break # nothing deeper to see, or no time to look
+            depth += 1
+        self.deadline = None
+        return bestAction
+
+    def searchRoot(self, gameState, key, depth, rootActions):
+        """
+          returns (best action, dictionary from each root action to its value)
+          for one round of iterative deepening.  Values of moves after the best
+          are upper bounds, which is all the next round's ordering needs.
+        """
+        nextAgent = (self.index + 1) % gameState.getNumAgents()
+        alpha = -float('inf')
+        rootValues = {}
+        bestValue, bestAction = None, None
+        for action, successor, successorKey in self.successors(gameState, self.index, key, rootActions):
+            value = self.alphaBeta(successor, nextAgent, depth - 1, successorKey, alpha, float('inf'), 1)[0]
+            rootValues[action] = value
+            if bestValue == None or value > bestValue:
+                bestValue, bestAction = value, action
+            alpha = max(alpha, bestValue)
+        if bestValue != None:
+            self.store(key, depth, TranspositionTable.EXACT, bestValue, bestAction)
+        return bestAction, rootValues
+
+    def alphaBeta(self, gameState, agentIndex, depth, key, alpha, beta, ply=0):
+        """
+          returns (value, action) of gameState with agentIndex to move and depth
+          agent moves left.  Values outside (alpha, beta) are only bounds, and
+          are stored in the table as such.  ply counts agent moves from the root.
+        """
+        if self.deadline != None and time.time() > self.deadline:
+            raise SearchTimeout()
+        if gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState), None
+        if depth == 0:
+            self.reachedHorizon = True
+            return self.evaluationFunction(gameState), None
+        entry = self.lookup(key, depth)
+        if entry != None:
+            flag, value = entry[1], entry[2]
+            if flag == TranspositionTable.EXACT or (flag == TranspositionTable.LOWER and value > beta) or \
+               (flag == TranspositionTable.UPPER and value < alpha):
+                self.reachedHorizon = True # the entry doesn't say, so assume there is more to see
+                return value, entry[3]
+
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        originalAlpha, originalBeta = alpha, beta
+        bestValue, bestAction = None, None
+        for action, successor, successorKey in self.orderedSuccessors(gameState, agentIndex, key, ply):
+            value = self.alphaBeta(successor, nextAgent, depth - 1, successorKey, alpha, beta, ply + 1)[0]
+            if agentIndex == 0:
+                if bestValue == None or value > bestValue:
+                    bestValue, bestAction = value, action
+                if bestValue > beta:
+                    self.recordCutoff(agentIndex, action, depth, ply)
+                    break
+                alpha = max(alpha, bestValue)
+            else:
+                if bestValue == None or value < bestValue:
+                    bestValue, bestAction = value, action
+                if bestValue < alpha:
+                    self.recordCutoff(agentIndex, action, depth, ply)
+                    break
+                beta = min(beta, bestValue)
+        if bestValue == None:
+            return self.evaluationFunction(gameState), None # no legal moves
+
+        if bestValue <= originalAlpha:
+            flag = TranspositionTable.UPPER
+        elif bestValue >= originalBeta:
+            flag = TranspositionTable.LOWER
+        else:
+            flag = TranspositionTable.EXACT
+        self.store(key, depth, flag, bestValue, bestAction)
+        return bestValue, bestAction
+
+    def orderedSuccessors(self, gameState, agentIndex, key, ply):
+        """
+          successors in the order most likely to cut: the best action the table
+          remembers for this node, then this ply's killer moves, then the rest
+          by history score.  Only iterative deepening reorders moves.
+        """
+        actions = gameState.getLegalActions(agentIndex)
+        if self.timeLimit <= 0:
+            return self.successors(gameState, agentIndex, key, actions)
+        first = list(self.killers.get(ply, []))
+        if self.table != None:
+            first.insert(0, self.table.bestAction(key))
+        ordered = []
+        for action in first:
+            if action in actions and action not in ordered:
+                ordered.append(action)
+        rest = [action for action in actions if action not in ordered]
+        rest.sort(key=lambda action: -self.history.get((agentIndex, action), 0))
+        return self.successors(gameState, agentIndex, key, ordered + rest)
+
+    def recordCutoff(self, agentIndex, action, depth, ply):
+        """ remembers action as a killer at ply and credits it in the history table """
+        if self.timeLimit <= 0:
+            return
+        killers = self.killers.get(ply, [])
+        if action not in killers:
+            self.killers[ply] = [action] + killers[:1]
+        self.history[(agentIndex, action)] = self.history.get((agentIndex, action), 0) + depth * depth
 
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
       Your expectimax agent (question 4)
+
+      Each ghost's move is a chance node.  Its legal moves are merged by the
+      Zobrist hash of the state they lead to, adding up their probabilities,
+      so moves that end in the same state are searched once, and its value
+      goes in the transposition table, so a chance node reached again by
+      another order of moves is not searched again.  Successors that are
+      leaves are evaluated together by evaluateLeaves, which also remembers
+      leaf values (up to tableSize of them) across getAction calls.
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '100000'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, tableSize)
+        self.maxLeaves = int(tableSize)
+        self.leafValues = {} # dictionary that has key as hash and value as the leaf's evaluation
+
     def getAction(self, gameState):
         """
           Returns the expectimax action using self.depth and self.evaluationFunction
@@ -233,18 +773,160 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
           All ghosts should be modeled as choosing uniformly at random from their
           legal moves.
         """
-        "*** YOUR CODE HERE ***"
-        util.raiseNotDefined()
+        key = self.startSearch(gameState)
+        value, action = self.maxValue(gameState, self.depth * gameState.getNumAgents(), key)
+        return action
+
+    def maxValue(self, gameState, depth, key):
+        """ returns (value, action) of gameState with Pacman to move and depth agent moves left """
+        if depth == 0 or gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState), None
+        entry = self.lookup(key, depth)
+        if entry != None:
+            return entry[2], entry[3]
+
+        nextAgent = (self.index + 1) % gameState.getNumAgents()
+        bestValue, bestAction = None, None
+        for action, successor, successorKey in self.successors(gameState, self.index, key):
+            value = self.agentValue(successor, nextAgent, depth - 1, successorKey)
+            if bestValue == None or value > bestValue:
+                bestValue, bestAction = value, action
+        if bestValue == None:
+            return self.evaluationFunction(gameState), None # no legal moves
+        self.store(key, depth, TranspositionTable.EXACT, bestValue, bestAction)
+        return bestValue, bestAction
+
+    def agentValue(self, gameState, agentIndex, depth, key):
+        """ the value of gameState with agentIndex to move: a max node for Pacman, a chance node for a ghost """
+        if agentIndex == self.index:
+            return self.maxValue(gameState, depth, key)[0]
+        return self.chanceValue(gameState, agentIndex, depth, key)
+
+    def chanceValue(self, gameState, agentIndex, depth, key):
+        """ returns the expected value of gameState with ghost agentIndex to move and depth agent moves left """
+        if depth == 0 or gameState.isWin() or gameState.isLose():
+            return self.evaluationFunction(gameState)
+        entry = self.lookup(key, depth)
+        if entry != None:
+            return entry[2]
+
+        outcomes = self.chanceOutcomes(gameState, agentIndex, key)
+        if len(outcomes) == 0:
+            return self.evaluationFunction(gameState) # no legal moves
+        nextAgent = (agentIndex + 1) % gameState.getNumAgents()
+        value = 0.0
+        leaves = []
+        for successor, successorKey, probability in outcomes:
+            if depth == 1 or successor.isWin() or successor.isLose():
+                leaves.append((successor, successorKey, probability))
+            else:
+                value += probability * self.agentValue(successor, nextAgent, depth - 1, successorKey)
+        leafValues = self.evaluateLeaves([leaf[0] for leaf in leaves], [leaf[1] for leaf in leaves])
+        for (successor, successorKey, probability), leafValue in zip(leaves, leafValues):
+            value += probability * leafValue
+        self.store(key, depth, TranspositionTable.EXACT, value)
+        return value
+
+    def chanceOutcomes(self, gameState, agentIndex, key):
+        """
+          returns the distinct successors of ghost agentIndex's uniformly random
+          move as (state, hash, probability), merging moves that reach the same state
+        """
+        actions = gameState.getLegalActions(agentIndex)
+        if self.table == None:
+            # no hashes to merge by
+            return [(successor, None, 1.0 / len(actions))
+                    for action, successor, successorKey in self.successors(gameState, agentIndex, key, actions)]
+        outcomes = {} # dictionary that has key as hash and value as (state, probability)
+        for action, successor, successorKey in self.successors(gameState, agentIndex, key, actions):
+            if successorKey in outcomes:
+                successor, probability = outcomes[successorKey]
+                outcomes[successorKey] = (successor, probability + 1.0 / len(actions))
+            else:
+                outcomes[successorKey] = (successor, 1.0 / len(actions))
+        return [(successor, successorKey, probability) for successorKey, (successor, probability) in outcomes.iteritems()]
+
+    def evaluateLeaves(self, states, keys):
+        """
+          evaluates a list of leaf states in one call, through the batch
+          version of the evaluation function in batchEvaluationFunctions if it
+          has one, skipping the states whose values are remembered
+        """
+        if self.table == None:
+            return self.evaluateBatch(states)
+        missing = [i for i in range(len(states)) if keys[i] not in self.leafValues]
+        if missing:
+            if len(self.leafValues) + len(missing) > self.maxLeaves:
+                self.leafValues = {}
+            for i, value in zip(missing, self.evaluateBatch([states[i] for i in missing])):
+                self.leafValues[keys[i]] = value
+        return [self.leafValues[key] for key in keys]
+
+    def evaluateBatch(self, states):
+        batch = batchEvaluationFunctions.get(self.evaluationFunction)
+        if batch != None:
+            return batch(states)
+        return [self.evaluationFunction(state) for state in states]
 
 def betterEvaluationFunction(currentGameState):
     """
       Your extreme ghost-hunting, pellet-nabbing, food-gobbling, unstoppable
       evaluation function (question 5).
 
-      DESCRIPTION: <write something here so we know what you did>
+      DESCRIPTION: starts from the game score and, using extractFeatures,
+      pulls Pacman toward the nearest food and capsule, rewards being in a
+      part of the maze that still has food, charges for every pellet and
+      capsule left, runs from ghosts that are not scared once they are close,
+      and chases scared ghosts it can reach before their timers run out.
+    """
+    if currentGameState.isWin() or currentGameState.isLose():
+        return currentGameState.getScore()
+    return currentGameState.getScore() + betterPacmanTerms(extractPacmanFeatures(currentGameState)) + \
+        betterGhostTerms(extractGhostFeatures(currentGameState))
+
+def betterPacmanTerms(features):
+    """ the part of betterEvaluationFunction that comes from food and capsules """
+    score = - 4 * features['numFood'] - 20 * features['numCapsules']
+    if features['nearestFood'] != None:
+        score += 10.0 / (features['nearestFood'] + 1)
+    if features['nearestCapsule'] != None:
+        score += 5.0 / (features['nearestCapsule'] + 1)
+    return score + 5 * features['foodDensity']
+
+def betterGhostTerms(features):
+    """ the part of betterEvaluationFunction that comes from the ghosts """
+    score = 0
+    activeGhost = features['nearestActiveGhost']
+    if activeGhost != None and activeGhost <= 2:
+        score -= 200.0 / (activeGhost + 1)
+    if features['nearestScaredGhost'] != None:
+        score += 100.0 / (features['nearestScaredGhost'] + 1)
+    return score
+
+def betterEvaluationBatch(states):
+    """
+      [betterEvaluationFunction(state) for state in states], with the food and
+      capsule terms worked out once for every group of states that differ
+      only in their ghosts, as the leaves under one chance node do
     """
-    "*** YOUR CODE HERE ***"
-    util.raiseNotDefined()
+    pacmanTerms = {} # dictionary that has key as (pacman, food grid, capsules) and value as betterPacmanTerms
+    values = []
+    for state in states:
+        if state.isWin() or state.isLose():
+            values.append(state.getScore())
+            continue
+        group = (state.getPacmanPosition(), id(state.getFood().data), tuple(state.getCapsules()))
+        if group not in pacmanTerms:
+            pacmanTerms[group] = betterPacmanTerms(extractPacmanFeatures(state))
+        values.append(state.getScore() + pacmanTerms[group] + betterGhostTerms(extractGhostFeatures(state)))
+    return values
+
+def scoreEvaluationBatch(states):
+    return [state.getScore() for state in states]
+
+# Evaluation functions that can evaluate a list of states in one call (see ExpectimaxAgent.evaluateLeaves)
+batchEvaluationFunctions = {scoreEvaluationFunction: scoreEvaluationBatch,
+                            betterEvaluationFunction: betterEvaluationBatch}
 
 # Abbreviation
 better = betterEvaluationFunction
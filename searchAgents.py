@@ -45,6 +45,12 @@ from collections import *
 import util
 import time
 import search
+import sys
+import os
+import mmap
+import array
+import struct
+import hashlib
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -73,6 +79,14 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      bidirectionalBreadthFirstSearch or bibfs (PositionSearchProblem only)
+      bidirectionalAStarSearch or biastar (PositionSearchProblem only)
+      jumpPointSearch or jps (PositionSearchProblem with unit costs only)
+      bitboardBreadthFirstSearch or bbfs (PositionSearchProblem only)
+      batchBreadthFirstSearch or batchbfs
+      anytimeAStarSearch or arastar (see also AnytimeSearchAgent)
+      iterativeDeepeningAStarSearch or idastar
+      simplifiedMemoryBoundedAStarSearch or smastar
 
 
     Note: You should NOT change any code in SearchAgent
@@ -121,6 +135,7 @@ class SearchAgent(Agent):
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if 'searchStats' in dir(problem): print(problem.searchStats)
 
     def getAction(self, state):
         """
@@ -148,21 +163,33 @@ class PositionSearchProblem(search.SearchProblem):
 
     Note: this search problem is fully specified; you should NOT change it.
     """
+    # Defaults for subclasses such as AnyFoodSearchProblem that skip __init__
+    headless = False
+    trace = None
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True,
+                 headless=False, trace=None):
         """
         Stores the start and goal.
 
         gameState: A GameState object (pacman.py)
         costFn: A function from a search state (tuple) to a non-negative number
         goal: A position in the gameState
+        headless: skip the display bookkeeping; successors come straight from
+                  the positionMoves table and _visited/_visitedlist stay empty
+        trace: an optional ExpansionTrace that samples the expanded states,
+               so a headless search can still be drawn afterwards
         """
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
         self.costFn = costFn
-        self.visualize = visualize
+        self.visualize = visualize and not headless
+        self.headless = headless
+        self.trace = trace
+        if headless:
+            self.moves = positionMoves(self.walls)
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print 'Warning: this does not look like a regular search maze'
 
@@ -196,6 +223,12 @@ class PositionSearchProblem(search.SearchProblem):
          required to get there, and 'stepCost' is the incremental
          cost of expanding to that successor
         """
+        if self.trace != None:
+            self.trace.record(state)
+        if self.headless:
+            self._expanded += 1 # DO NOT CHANGE
+            costFn = self.costFn
+            return [(nextState, action, costFn(nextState)) for nextState, action in self.moves[state]]
 
         successors = []
         for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
@@ -215,6 +248,61 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getSuccessorsBatch(self, states):
+        """
+        Returns [getSuccessors(state) for state in states] without the per
+        state direction loop: the moves out of every open cell come from a
+        table built once per walls grid (see positionMoves).
+        """
+        moves, costFn = positionMoves(self.walls), self.costFn
+        batch = [[(nextState, action, costFn(nextState)) for nextState, action in moves[state]] for state in states]
+        self._expanded += len(states)
+        if self.trace != None:
+            for state in states:
+                self.trace.record(state)
+        if self.headless:
+            return batch
+
+        # Bookkeeping for display purposes
+        for state in states:
+            if state not in self._visited:
+                self._visited[state] = True
+                self._visitedlist.append(state)
+
+        return batch
+
+    def getPredecessors(self, state):
+        """
+        Returns the states that lead to state in one step, as triples
+        (predecessor, action, stepCost) where action moves predecessor to state.
+        Bidirectional searches use this to search backward from the goal.
+        """
+        predecessors = []
+        cost = self.costFn(state)
+        x,y = state
+        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            dx, dy = Actions.directionToVector(action)
+            prevx, prevy = int(x - dx), int(y - dy)
+            if not self.walls[prevx][prevy]:
+                predecessors.append( ( (prevx, prevy), action, cost) )
+
+        self._expanded += 1
+        if self.trace != None:
+            self.trace.record(state)
+        if self.headless:
+            return predecessors
+
+        # Bookkeeping for display purposes
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
+    def goalPositions(self):
+        "The positions that satisfy isGoalState, for searches that work on whole grids"
+        return [self.goal]
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -271,6 +359,37 @@ def euclideanHeuristic(position, problem, info={}):
 # This portion is incomplete.  Time to write code!  #
 #####################################################
 
+class ExpansionTrace:
+    """
+    Keeps a sample of the states a search expands, so a headless
+    PositionSearchProblem can still be drawn afterwards:
+
+      trace = ExpansionTrace(sampleEvery=10)
+      problem = PositionSearchProblem(gameState, headless=True, trace=trace)
+      ...search...
+      trace.draw()
+
+    Every sampleEvery-th expansion is kept, up to maxStates states.
+    """
+
+    def __init__(self, sampleEvery=1, maxStates=None):
+        self.sampleEvery = sampleEvery
+        self.maxStates = maxStates
+        self.expanded = 0 # expansions seen, sampled or not
+        self.states = [] # the sampled states, in expansion order
+
+    def record(self, state):
+        self.expanded += 1
+        if self.expanded % self.sampleEvery == 0 and (self.maxStates == None or len(self.states) < self.maxStates):
+            self.states.append(state)
+
+    def draw(self):
+        "Draws the sampled states on pacman.py's display, if there is one"
+        import __main__
+        if '_display' in dir(__main__):
+            if 'drawExpandedCells' in dir(__main__._display): #@UndefinedVariable
+                __main__._display.drawExpandedCells(self.states) #@UndefinedVariable
+
 class CornersProblem(search.SearchProblem):
     """
     This search problem finds paths through all four corners of a layout.
@@ -293,44 +412,41 @@ class CornersProblem(search.SearchProblem):
         # Please add any code here which you would like to use
         # in initializing the problem
         self.startingGameState = startingGameState
+        self.heuristicInfo = {} # A dictionary for the heuristic to store information
 
-    def removeCorners(self, positionTuple, tuples):
-        print "original corners ", tuples
-        listTuple = list(tuples)
-        if positionTuple in listTuple:
-            print "this is removing corner ", positionTuple
-            print "original LIST TUPLE ", listTuple
-            listTuple.remove(positionTuple)
-            print "resulted corners ", listTuple
+        # corner i is still to be visited while bit i of the state's mask is set
+        cornerBits = dict([(corner, 1 << i) for i, corner in enumerate(self.corners)])
+        self.moves = packedMoves(self.walls, cornerBits)
+        startCell = self.packPosition(self.startingPosition)
+        self.startState = (startCell, 15 & ~cornerBits.get(self.startingPosition, 0))
 
-        return tuple(listTuple)
+    def packPosition(self, position):
+        x, y = position
+        return x * self.walls.height + y
 
+    def unpackPosition(self, cell):
+        return divmod(cell, self.walls.height)
+
+    def positionAndCorners(self, state):
+        "Returns Pacman's (x,y) and the list of corners still to be visited in state"
+        cell, cornerMask = state
+        return self.unpackPosition(cell), [corner for i, corner in enumerate(self.corners) if cornerMask & (1 << i)]
 
     def getStartState(self):
         """
         Returns the start state (in your state space, not the full Pacman state
         space)
         """
-        # use list as datastructure for state
-        # state = (startPosition, currentPosition, cornersToVisit)
-        # startPosition is a tuple of location (x, y)
-        # cornersToVisit is a set of each forners 
-        state = (self.startingPosition, self.startingPosition, self.corners)
-
-        # check if the starting position is corner
-        if state[0] in state[2]:
-            state = (self.startPosition, self.startingPosition, removeCorners(state[0], self.corners))
-
-        return state
+        # state = (cell, cornerMask)
+        # cell is the current position packed into one int, x * walls.height + y
+        # cornerMask has bit i set while self.corners[i] has not been visited
+        return self.startState
 
     def isGoalState(self, state):
         """
         Returns whether this search state is a goal state of the problem.
         """
-        if len(state[2]) == 0:
-            return True
-        else:
-            return False
+        return state[1] == 0
 
     def getSuccessors(self, state):
         """
@@ -342,32 +458,16 @@ class CornersProblem(search.SearchProblem):
             state, 'action' is the action required to get there, and 'stepCost'
             is the incremental cost of expanding to that successor
         """
-
-        successors = []
-        actions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
-        for action in actions:
-
-            currentPosition = state[1]
-
-            x,y = currentPosition
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            hitsWall = self.walls[nextx][nexty]
-
-            if not hitsWall:
-                successorState = state
-                successorStateList = list(successorState)
-                successorStateList[1] = (nextx, nexty)
-                successorStateList[2] = list(successorStateList[2])
-
-                if (nextx, nexty) in successorStateList[2]:
-                    successorStateList[2].remove((nextx, nexty))
-
-                successorStateList[2] = tuple(successorStateList[2])
-                successors += [(tuple(successorStateList), action, self.getCostOfActions([action]))]
-
         self._expanded += 1 # DO NOT CHANGE
-        return successors
+        cell, cornerMask = state
+        return [((nextCell, cornerMask & ~cornerBit), action, 1) for nextCell, action, cornerBit in self.moves[cell]]
+
+    def getSuccessorsBatch(self, states):
+        "Returns [getSuccessors(state) for state in states]"
+        self._expanded += len(states)
+        moves = self.moves
+        return [[((nextCell, cornerMask & ~cornerBit), action, 1) for nextCell, action, cornerBit in moves[cell]]
+                for cell, cornerMask in states]
 
     def getCostOfActions(self, actions):
         """
@@ -399,7 +499,27 @@ def cornersHeuristic(state, problem):
     corners = problem.corners # These are the corner coordinates
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
-    completeNodeList = [state[1]] + list(state[2])
+    return cachedHeuristic(problem, cornersMazeHeuristic)(state, problem)
+
+def cornersMazeHeuristic(state, problem):
+    """
+    The bound of foodMazeHeuristic with the unvisited corners as the food:
+    the larger of the maze distance to the closest corner plus a maze
+    distance spanning tree over the corners, and the maze distance to the
+    farthest corner.  Maze distances are never shorter than straight lines,
+    so it is never below cornersMSTHeuristic, and it is consistent for the
+    same reasons foodMazeHeuristic is.
+    """
+    info = problem.heuristicInfo
+    if 'cornerFields' not in info:
+        info['cornerFields'], info['cornerMazeTrees'] = mazeSpanningTrees(problem.walls, problem.corners)
+    cell, cornerMask = state
+    return mazeSpanningBound(info['cornerFields'], info['cornerMazeTrees'], cell, cornerMask)
+
+def cornersMSTHeuristic(state, problem):
+    "The length of a minimum spanning tree over Pacman and the unvisited corners"
+    position, remainingCorners = problem.positionAndCorners(state)
+    completeNodeList = [position] + remainingCorners
     completeEdges = foodConnections(completeNodeList, problem.startingGameState)
     mst, mstLength = minSpanTree(completeNodeList, completeEdges)
 
@@ -416,6 +536,23 @@ def calculateEuclideanAtoB(posA, posB):
     # manhatten distance from position A to position B
     return ( (posA[0] - posB[0]) ** 2 + (posA[1] - posB[1]) ** 2 ) ** 0.5
 
+class AnytimeSearchAgent(SearchAgent):
+    """
+    A SearchAgent that plans with anytimeAStarSearch, so it always has a plan
+    after about timeLimit seconds: the best one found by then.  Options come
+    in as strings from pacman.py's -a, e.g.
+
+    > python pacman.py -l bigSearch -p AnytimeSearchAgent -a timeLimit=2,weight=5
+    """
+    def __init__(self, prob='PackedFoodSearchProblem', heuristic='foodHeuristic', timeLimit='1.0', weight='3.0'):
+        SearchAgent.__init__(self, 'anytimeAStarSearch', prob, heuristic)
+        if heuristic in globals().keys():
+            heur = globals()[heuristic]
+        else:
+            heur = getattr(search, heuristic)
+        timeLimit, weight = float(timeLimit), float(weight)
+        self.searchFunction = lambda prob: search.anytimeAStarSearch(prob, heur, timeLimit, weight)
+
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
@@ -437,13 +574,13 @@ class FoodSearchProblem:
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
+        self.foodPositions = startingGameState.getFood().asList()
+        self.foodBits = dict([(position, 1 << i) for i, position in enumerate(self.foodPositions)])
 
     def getStartState(self):
         return self.start
 
     def isGoalState(self, state):
-        if self.heuristicInfo:
-            return self.heuristicInfo['foodCount'] == 0
         return state[1].count() == 0
 
     def getSuccessors(self, state):
@@ -460,6 +597,20 @@ class FoodSearchProblem:
                 successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
         return successors
 
+    def getSuccessorsBatch(self, states):
+        "Returns [getSuccessors(state) for state in states], looking moves up in positionMoves"
+        self._expanded += len(states)
+        moves = positionMoves(self.walls)
+        batch = []
+        for position, food in states:
+            successors = []
+            for (nextx, nexty), direction in moves[position]:
+                nextFood = food.copy()
+                nextFood[nextx][nexty] = False
+                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+            batch.append(successors)
+        return batch
+
     def getCostOfActions(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
         include an illegal move, return 999999"""
@@ -474,11 +625,171 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+    def positionAndFood(self, state):
+        "Returns Pacman's (x,y) and the list of remaining food positions in state"
+        return state[0], state[1].asList()
+
+    def positionAndFoodMask(self, state):
+        """
+        Returns Pacman's (x,y) and the remaining food as a mask whose bit i is
+        set while foodPositions[i] still has food
+        """
+        foodBits = self.foodBits
+        foodMask = 0
+        for position in state[1].asList():
+            foodMask |= foodBits[position]
+        return state[0], foodMask
+
+    def heuristicKey(self, state):
+        """
+        The key cachedHeuristic stores this state's value under: Pacman's
+        position and the food mask, so the cache holds no Grids and never
+        hashes one
+        """
+        return self.positionAndFoodMask(state)
+
+class PackedFoodSearchProblem(FoodSearchProblem):
+    """
+    A FoodSearchProblem with a compact state, a tuple ( cell, foodMask ) where
+      cell:     Pacman's position packed into one int, x * walls.height + y
+      foodMask: an int whose bit i is set while foodPositions[i] still has food
+
+    The moves out of every open cell, and the food bit each one eats, are
+    worked out once up front, so generating a successor is a mask operation
+    and states hash and compare as two ints instead of a Grid.
+    """
+    def __init__(self, startingGameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        self.moves = packedMoves(self.walls, self.foodBits)
+
+        self.start = (self.packPosition(startingGameState.getPacmanPosition()),
+                      (1 << len(self.foodPositions)) - 1)
+
+    def packPosition(self, position):
+        x, y = position
+        return x * self.walls.height + y
+
+    def unpackPosition(self, cell):
+        return divmod(cell, self.walls.height)
+
+    def unpackFood(self, foodMask):
+        "Returns the positions of the food whose bits are set in foodMask"
+        foodList = []
+        while foodMask:
+            lowestBit = foodMask & -foodMask
+            foodList.append(self.foodPositions[lowestBit.bit_length() - 1])
+            foodMask ^= lowestBit
+        return foodList
+
+    def positionAndFood(self, state):
+        return self.unpackPosition(state[0]), self.unpackFood(state[1])
+
+    def positionAndFoodMask(self, state):
+        return self.unpackPosition(state[0]), state[1]
+
+    def heuristicKey(self, state):
+        return state # already a cell and a food mask
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        cell, foodMask = state
+        return [((nextCell, foodMask & ~foodBit), direction, 1) for nextCell, direction, foodBit in self.moves[cell]]
+
+    def getSuccessorsBatch(self, states):
+        "Returns [getSuccessors(state) for state in states]"
+        self._expanded += len(states)
+        moves = self.moves
+        return [[((nextCell, foodMask & ~foodBit), direction, 1) for nextCell, direction, foodBit in moves[cell]]
+                for cell, foodMask in states]
+
+    def getCostOfActions(self, actions):
+        """Returns the cost of a particular sequence of actions.  If those actions
+        include an illegal move, return 999999"""
+        x,y= self.unpackPosition(self.getStartState()[0])
+        cost = 0
+        for action in actions:
+            dx, dy = Actions.directionToVector(action)
+            x, y = int(x + dx), int(y + dy)
+            if self.walls[x][y]:
+                return 999999
+            cost += 1
+        return cost
+
+def packedMoves(walls, bitsByPosition):
+    """
+    Precomputes the moves of a packed-state problem.  The result is indexed by
+    cell, x * walls.height + y, and holds for every open cell a list of
+    (next cell, direction, bit) where bit is bitsByPosition's entry for the
+    next position, or 0 if it has none.  Wall cells hold None.
+    """
+    moves = [None] * (walls.width * walls.height)
+    for x in range(walls.width):
+        for y in range(walls.height):
+            if walls[x][y]:
+                continue
+            cellMoves = []
+            for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(direction)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not walls[nextx][nexty]:
+                    cellMoves.append((nextx * walls.height + nexty, direction, bitsByPosition.get((nextx, nexty), 0)))
+            moves[x * walls.height + y] = cellMoves
+    return moves
+
+class LayoutCache:
+    """
+    Remembers one value per walls grid for the maxSize grids used most
+    recently.  Entries are keyed by id(walls) and keep the grid itself, so an
+    id is never mistaken for another grid's; once more than maxSize grids are
+    held, the one used longest ago is dropped.
+    """
+
+    def __init__(self, maxSize=8):
+        self.maxSize = maxSize
+        self.entries = OrderedDict() # key is id(walls), value is (walls, value); oldest use first
+
+    def get(self, walls):
+        "Returns the value stored for walls, or None"
+        entry = self.entries.pop(id(walls), None)
+        if entry == None or entry[0] is not walls:
+            return None
+        self.entries[id(walls)] = entry # mark as most recently used
+        return entry[1]
+
+    def put(self, walls, value):
+        self.entries.pop(id(walls), None)
+        self.entries[id(walls)] = (walls, value)
+        if len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+_positionMoves = LayoutCache() # positionMoves table of each walls grid
+
+def positionMoves(walls):
+    """
+    Returns a dictionary whose key is every open (x, y) of walls and whose
+    value is the list of (next position, direction) moves out of it, in the
+    same order as PositionSearchProblem.getSuccessors.  The table is built
+    the first time those walls are seen.
+    """
+    moves = _positionMoves.get(walls)
+    if moves == None:
+        moves = {}
+        for cellMoves, cell in zip(packedMoves(walls, {}), range(walls.width * walls.height)):
+            if cellMoves != None:
+                moves[divmod(cell, walls.height)] = [(divmod(nextCell, walls.height), direction)
+                                                     for nextCell, direction, bit in cellMoves]
+        _positionMoves.put(walls, moves)
+    return moves
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
-        self.searchType = FoodSearchProblem
+        self.searchType = PackedFoodSearchProblem
 
 def minSpanTree(nodes, edges):
     # uses prim's algorithm - got a lot of guidence from this: https://programmingpraxis.com/2010/04/09/minimum-spanning-tree-prims-algorithm/
@@ -515,6 +826,130 @@ def foodConnections(foodList, gameState):
                 edgeDic[(firstFood, secondFood)] = calculateEuclideanAtoB(firstFood, secondFood)
     return edgeDic
 
+class FoodSpanningTrees:
+    """
+    Minimum spanning tree weights over Pacman and the remaining food of one
+    FoodSearchProblem.
+
+    The food-to-food distances are worked out once into a flat n*n list,
+    matrix[i * n + j], so building a tree is an O(n^2) Prim that reads the
+    list instead of building an edge dictionary and a heap for every state.
+
+    weight() is incremental.  The tree over the food alone depends only on
+    the food mask, so it is built once per mask and kept in a bounded cache.
+    Adding Pacman to it only needs the tree's edges plus Pacman's n edges (an
+    MST of a graph plus one vertex never uses an edge the old MST dropped), so
+    a state costs a sort of 2n edges instead of a new tree.  A child state
+    that just ate pellet i has Pacman standing on it, so its node set is
+    exactly its parent's food: its weight is the cached tree of foodMask | bit
+    i, with no work at all.
+    """
+
+    def __init__(self, foodPositions, distance=None, maxTrees=20000):
+        if distance == None:
+            distance = calculateEuclideanAtoB
+        self.foodPositions = foodPositions
+        self.foodIndex = dict([(position, i) for i, position in enumerate(foodPositions)])
+        self.distance = distance
+        n = len(foodPositions)
+        self.matrix = [distance(first, second) for first in foodPositions for second in foodPositions]
+        # key is a food mask, value is (weight, edges) of the tree over that food
+        self.trees = search.HeuristicCache(lambda foodMask, problem: self.foodTree(foodMask), maxTrees)
+
+    def indices(self, foodMask):
+        "Returns the food indices whose bits are set in foodMask"
+        indices = []
+        while foodMask:
+            lowestBit = foodMask & -foodMask
+            indices.append(lowestBit.bit_length() - 1)
+            foodMask ^= lowestBit
+        return indices
+
+    def prim(self, root, rootDistances, indices):
+        """
+        Dense Prim's algorithm from root over the food in indices, where
+        rootDistances[k] is the distance from root to indices[k].  Returns
+        (weight, edges) with edges a list of (distance, node1, node2).
+        """
+        n = len(self.foodPositions)
+        matrix = self.matrix
+        remaining = list(indices)
+        bestDistances = list(rootDistances) # cheapest known edge from the tree to remaining[k]
+        bestFrom = [root] * len(remaining)
+        weight = 0
+        edges = []
+        while remaining:
+            k = min(xrange(len(remaining)), key=bestDistances.__getitem__)
+            node, distance = remaining[k], bestDistances[k]
+            weight += distance
+            edges.append((distance, bestFrom[k], node))
+            # drop k by moving the last entry into its place
+            remaining[k], bestDistances[k], bestFrom[k] = remaining[-1], bestDistances[-1], bestFrom[-1]
+            remaining.pop(); bestDistances.pop(); bestFrom.pop()
+            row = node * n
+            for k in xrange(len(remaining)):
+                distance = matrix[row + remaining[k]]
+                if distance < bestDistances[k]:
+                    bestDistances[k] = distance
+                    bestFrom[k] = node
+        return weight, edges
+
+    def foodTree(self, foodMask):
+        "Returns (weight, edges) of the minimum spanning tree over the food in foodMask"
+        indices = self.indices(foodMask)
+        if not indices:
+            return 0, []
+        root = indices[0]
+        n = len(self.foodPositions)
+        return self.prim(root, [self.matrix[root * n + i] for i in indices[1:]], indices[1:])
+
+    def denseWeight(self, position, foodMask):
+        "The tree weight over position and the food in foodMask, built from scratch"
+        indices = self.indices(foodMask)
+        distance, foodPositions = self.distance, self.foodPositions
+        return self.prim(-1, [distance(position, foodPositions[i]) for i in indices], indices)[0]
+
+    def weight(self, position, foodMask):
+        "The tree weight over position and the food in foodMask, using the cached food trees"
+        if foodMask == 0:
+            return 0
+        i = self.foodIndex.get(position)
+        if i != None:
+            # Pacman is on pellet i, so the nodes are the food of mask | bit i:
+            # the parent's food when it has just eaten i, foodMask itself if not
+            return self.foodWeight(foodMask | (1 << i))
+        foodTreeEdges = self.trees(foodMask)[1]
+
+        # Kruskal's algorithm over the food tree's edges and Pacman's edges
+        indices = self.indices(foodMask)
+        distance, foodPositions = self.distance, self.foodPositions
+        pacman = len(foodPositions)
+        edges = foodTreeEdges + [(distance(position, foodPositions[i]), pacman, i) for i in indices]
+        edges.sort()
+        parents = {} # union-find forest, key is a node and value is its parent
+        def find(node):
+            while node in parents:
+                parent = parents[node]
+                if parent in parents:
+                    parents[node] = parents[parent] # path halving
+                node = parent
+            return node
+        weight = 0
+        needed = len(indices)
+        for length, node1, node2 in edges:
+            root1, root2 = find(node1), find(node2)
+            if root1 != root2:
+                parents[root1] = root2
+                weight += length
+                needed -= 1
+                if needed == 0:
+                    break
+        return weight
+
+    def foodWeight(self, foodMask):
+        "The tree weight over the food in foodMask alone"
+        return self.trees(foodMask)[0]
+
 def foodHeuristic(state, problem):
     """
     self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
@@ -549,38 +984,140 @@ def foodHeuristic(state, problem):
     Subsequent calls to this heuristic can access
     problem.heuristicInfo['wallCount']
     """
-    # For this problem, I am going to use Prim's algorithm to get the minimum spanning tree - which 
-    # will indicate the shortest distance that the packmen needs to travel from the current 
-    # node to every other nodes (foods)
+    return cachedHeuristic(problem, foodMazeHeuristic)(state, problem)
 
-    position, foodGrid = state
-    x, y = position    # Only execute at the start of the program
+def foodMazeHeuristic(state, problem):
+    """
+    A bound on the steps left that uses maze distances instead of straight
+    lines.  Pacman has to walk to some first food, then on to all the others,
+    which is at least the maze distance to the closest food plus the length
+    of a minimum spanning tree over the food by maze distance.  It also has
+    to reach the farthest food, so the larger of the two is used.
+
+    Both bounds change by at most 1 per step and the tree only shrinks when a
+    pellet is eaten, so the heuristic is consistent as well as admissible.
+    The BFS distance field of every food cell is worked out once and kept in
+    problem.heuristicInfo.
+    """
+    info = problem.heuristicInfo
+    if 'foodFields' not in info:
+        info['foodFields'], info['foodMazeTrees'] = mazeSpanningTrees(problem.walls, problem.foodPositions)
+    (x, y), foodMask = problem.positionAndFoodMask(state)
+    return mazeSpanningBound(info['foodFields'], info['foodMazeTrees'], x * problem.walls.height + y, foodMask)
 
-    completeNodeList = [position] + foodGrid.asList()
-    completeEdges = foodConnections(completeNodeList, problem.startingGameState)
-    mst, mstLength = minSpanTree(completeNodeList, completeEdges)
+def mazeSpanningTrees(walls, positions):
+    """
+    Returns (fields, trees) for the bound of foodMazeHeuristic over
+    positions: fields[i] is the mazeDistanceField of positions[i] and trees
+    the FoodSpanningTrees of positions by maze distance.
+    """
+    fields = [mazeDistanceField(walls, position) for position in positions]
+    index = dict([(position, i) for i, position in enumerate(positions)])
+    def distance(position1, position2):
+        x, y = position2
+        return fields[index[position1]][x * walls.height + y]
+    return fields, FoodSpanningTrees(positions, distance)
+
+def mazeSpanningBound(fields, trees, cell, mask):
+    """
+    The bound of foodMazeHeuristic for Pacman at cell (x * walls.height + y)
+    with the positions whose bits are set in mask left to visit
+    """
+    if mask == 0:
+        return 0
+    distances = [fields[i][cell] for i in trees.indices(mask)]
+    return max(min(distances) + trees.foodWeight(mask), max(distances))
 
-    return mstLength
+def mazeDistanceField(walls, start):
+    """
+    Runs a BFS from start and returns the maze distance to every cell as a
+    list indexed by x * walls.height + y.  Walls and cells that cannot be
+    reached hold infinity.
+    """
+    height = walls.height
+    field = [float('inf')] * (walls.width * height)
+    x, y = start
+    field[x * height + y] = 0
+    queue = [start]
+    head = 0
+    while head < len(queue):
+        x, y = queue[head]
+        head += 1
+        nextDistance = field[x * height + y] + 1
+        for nextx, nexty in ((x, y+1), (x, y-1), (x+1, y), (x-1, y)):
+            if not walls[nextx][nexty] and field[nextx * height + nexty] > nextDistance:
+                field[nextx * height + nexty] = nextDistance
+                queue.append((nextx, nexty))
+    return field
+
+def foodMSTHeuristic(state, problem):
+    "The length of a minimum spanning tree over Pacman and the remaining food"
+    # For this problem, I am going to use Prim's algorithm to get the minimum spanning tree - which 
+    # will indicate the shortest distance that the packmen needs to travel from the current 
+    # node to every other nodes (foods)
 
+    # works on both the Grid state of FoodSearchProblem and the packed state of
+    # PackedFoodSearchProblem
+    if 'foodTrees' not in problem.heuristicInfo:
+        problem.heuristicInfo['foodTrees'] = FoodSpanningTrees(problem.foodPositions)
+    position, foodMask = problem.positionAndFoodMask(state)
+    return problem.heuristicInfo['foodTrees'].weight(position, foodMask)
 
+def cachedHeuristic(problem, heuristic):
+    """
+    Returns the search.HeuristicCache for heuristic on this problem, creating
+    it in problem.heuristicInfo on first use so that every call during a
+    search, and any later search on the same problem, shares it.  Problems
+    with a heuristicKey method (the food problems) have their states cached
+    under that compact key instead of the state itself.
+    """
+    cacheKey = heuristic.__name__ + 'Cache'
+    if cacheKey not in problem.heuristicInfo:
+        key = None
+        if hasattr(problem, 'heuristicKey'):
+            key = problem.heuristicKey
+        problem.heuristicInfo[cacheKey] = search.HeuristicCache(heuristic, key=key)
+    return problem.heuristicInfo[cacheKey]
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
-        self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
-            self.actions += nextPathSegment
-            for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception, 'findPathToClosestDot returned an illegal move: %s!\n%s' % t
-                currentState = currentState.generateSuccessor(0, action)
+        self.actions = self.planClosestDots(state.getPacmanPosition(), state.getFood(), state.getWalls())
         self.actionIndex = 0
         print 'Path found with cost %d.' % len(self.actions)
 
+    def planClosestDots(self, startPosition, food, walls):
+        """
+        Returns the actions that eat all of food by always walking to the
+        closest remaining dot.
+
+        The remaining food is one BitboardMaze mask that loses a bit as each
+        dot is eaten, and each leg is a bitboard BFS out from the last dot
+        that stops at the first layer holding food, so no GameState is
+        copied.  Ties and paths are the ones search.bfs would have found (see
+        BitboardMaze.pathToAny).  A shortest path to the closest dot cannot
+        pass another dot on the way, so clearing the one bit is all the update
+        needed.  Moves are checked against the walls grid.
+        """
+        maze = getBitboardMaze(walls)
+        foodMask = maze.mask(food.asList())
+        position = startPosition
+        actions = []
+        while foodMask:
+            bit, path = maze.pathToAny(position, foodMask)
+            if bit == None:
+                raise Exception, 'Food left at %s cannot be reached from %s' % (maze.position(foodMask & -foodMask), position)
+            x, y = position
+            for action in path:
+                dx, dy = Actions.directionToVector(action)
+                x, y = int(x + dx), int(y + dy)
+                if walls[x][y]:
+                    raise Exception, 'planClosestDots made an illegal move: %s into %s!' % (str(action), str((x, y)))
+                actions.append(action)
+            position = maze.position(bit)
+            foodMask &= ~bit
+        return actions
+
     def findPathToClosestDot(self, gameState):
         """
         Returns a path (a list of actions) to the closest dot, starting from
@@ -590,11 +1127,8 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
-        if problem.isGoalState(startPosition):
-            return []
-        else:
-            return search.bfs(problem)
+        maze = getBitboardMaze(walls)
+        return maze.pathToAny(startPosition, maze.mask(food.asList()))[1] or []
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -632,6 +1166,9 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # check if we are at the location where food is!
         return self.food.data[x][y]
 
+    def goalPositions(self):
+        return self.food.asList()
+
 def mazeDistance(point1, point2, gameState):
     """
     Returns the maze distance between any two points, using the search functions
@@ -641,11 +1178,317 @@ def mazeDistance(point1, point2, gameState):
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
     This might be a useful helper function for your ApproximateSearchAgent.
+
+    The first mazeDistanceIndexAfter calls on a layout are each a bitboard
+    BFS that stops when it reaches point2.  After that, if the layout has at
+    most mazeDistanceIndexMaxCells open cells (the index takes O(n^2) time
+    and memory), or as soon as anything else (mazeDistanceHeuristic,
+    getMazeDistanceIndex) has built the layout's MazeDistanceIndex,
+    distances come from the index in O(1).
+    Like the bfs this replaced, it returns 0 when point2 cannot be reached.
     """
     x1, y1 = point1
     x2, y2 = point2
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    index = _mazeDistanceIndexesById.get(walls)
+    if index != None:
+        distance = index.distance(point1, point2)
+    else:
+        calls = _mazeDistanceCalls.get(walls)
+        if calls == None:
+            calls = (0, walls.count(False))
+        _mazeDistanceCalls.put(walls, (calls[0] + 1, calls[1]))
+        if calls[0] + 1 >= mazeDistanceIndexAfter and calls[1] <= mazeDistanceIndexMaxCells:
+            distance = getMazeDistanceIndex(walls).distance(point1, point2)
+        else:
+            distance = getBitboardMaze(walls).distance(point1, point2)
+    if distance == MazeDistanceIndex.UNREACHABLE:
+        return 0 # no path, as len(bfs(...)) used to return
+    return distance
+
+mazeDistanceIndexAfter = 100 # mazeDistance calls on one layout before it builds the all-pairs index
+mazeDistanceIndexMaxCells = 1000 # larger layouts keep using the BFS unless the index is built elsewhere
+_mazeDistanceCalls = LayoutCache() # (number of mazeDistance calls, open cells) of each walls grid
+
+class MazeDistanceIndex:
+    """
+    All-pairs maze distances for one walls grid.
+
+    Every open cell gets an index, and a BFS from each of them fills one row of
+    a flat n*n table of unsigned 16 bit distances, so distance() is a dict
+    lookup plus an array read.  The table can be written to a cache file named
+    after a hash of the walls and memory-mapped back on later runs instead of
+    being rebuilt.  Pairs that are not connected get UNREACHABLE.
+
+    Use getMazeDistanceIndex(walls) rather than building one directly; it
+    keeps one index per walls grid for the life of the process.
+    """
+    UNREACHABLE = 65535
+    MAGIC = 'MDI1'
+
+    def __init__(self, walls, cacheDir=None, key=None):
+        self.width, self.height = walls.width, walls.height
+        self.cells = [] # open cell positions, in index order
+        self.cellIndex = {} # key is position (x, y), value is its index into cells
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if not walls[x][y]:
+                    self.cellIndex[(x, y)] = len(self.cells)
+                    self.cells.append((x, y))
+        if key == None:
+            key = wallsKey(walls)
+        self.key = key
+
+        self.table = None
+        cachePath = None
+        if cacheDir != None:
+            cachePath = os.path.join(cacheDir, 'mazeDistance-%s.bin' % self.key)
+            if os.path.exists(cachePath):
+                self.table = self.loadTable(cachePath)
+        if self.table == None:
+            self.table = self.buildTable(walls)
+            if cachePath != None:
+                self.saveTable(cachePath)
+
+    def distance(self, point1, point2):
+        "Returns the maze distance between two open cells in O(1)"
+        index = self.cellIndex
+        return self.table[index[point1] * len(self.cells) + index[point2]]
+
+    def distancesFrom(self, point):
+        "Returns a dictionary of the maze distance from point to every reachable open cell"
+        n = len(self.cells)
+        start = self.cellIndex[point] * n
+        return dict([(self.cells[i], self.table[start + i]) for i in range(n)
+                     if self.table[start + i] != self.UNREACHABLE])
+
+    def buildTable(self, walls):
+        "Runs a BFS from every open cell and stores the distances row by row"
+        n = len(self.cells)
+        neighbors = []
+        for x, y in self.cells:
+            neighbors.append([self.cellIndex[pos] for pos in ((x, y+1), (x, y-1), (x+1, y), (x-1, y))
+                              if pos in self.cellIndex])
+
+        table = array.array('H', [self.UNREACHABLE]) * (n * n)
+        for source in range(n):
+            row = source * n
+            table[row + source] = 0
+            queue = [source]
+            head = 0
+            while head < len(queue):
+                cell = queue[head]
+                head += 1
+                nextDistance = table[row + cell] + 1
+                for neighbor in neighbors[cell]:
+                    if table[row + neighbor] == self.UNREACHABLE:
+                        table[row + neighbor] = nextDistance
+                        queue.append(neighbor)
+        return table
+
+    def saveTable(self, path):
+        "Writes the table as a small header followed by little endian uint16 distances"
+        table = self.table
+        if sys.byteorder != 'little':
+            table = array.array('H', table)
+            table.byteswap()
+        tempPath = path + '.%d.tmp' % os.getpid()
+        f = open(tempPath, 'wb')
+        try:
+            f.write(self.MAGIC + struct.pack('<III', self.width, self.height, len(self.cells)))
+            table.tofile(f)
+        finally:
+            f.close()
+        os.rename(tempPath, path) # atomic, so a concurrent reader never sees half a file
+
+    def loadTable(self, path):
+        "Memory-maps a table written by saveTable; returns None if it does not match this layout"
+        headerSize = len(self.MAGIC) + struct.calcsize('<III')
+        n = len(self.cells)
+        if os.path.getsize(path) != headerSize + 2 * n * n:
+            return None # empty or truncated (mmap cannot map an empty file), so rebuild it
+        f = open(path, 'rb')
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        if mapped[:len(self.MAGIC)] != self.MAGIC \
+                or struct.unpack_from('<III', mapped, len(self.MAGIC)) != (self.width, self.height, n):
+            mapped.close()
+            return None
+        return MappedDistanceTable(mapped, headerSize)
+
+class MappedDistanceTable:
+    "Read-only view of a memory-mapped distance table, indexed like the array it was saved from"
+
+    def __init__(self, mapped, offset):
+        self.mapped = mapped
+        self.offset = offset
+
+    def __getitem__(self, i):
+        return struct.unpack_from('<H', self.mapped, self.offset + 2 * i)[0]
+
+def wallsKey(walls):
+    "A hash of a walls grid, used to key cached distance tables"
+    rows = [''.join([walls[x][y] and '%' or ' ' for x in range(walls.width)]) for y in range(walls.height)]
+    return hashlib.sha1('%d,%d\n' % (walls.width, walls.height) + '\n'.join(rows)).hexdigest()
+
+mazeDistanceCacheDir = None # set to a directory to keep distance tables on disk between runs
+_mazeDistanceIndexes = OrderedDict() # key is wallsKey, value is the MazeDistanceIndex built for those walls; oldest use first
+_mazeDistanceIndexesById = LayoutCache() # MazeDistanceIndex of each walls grid, so repeat calls skip hashing
+
+def getMazeDistanceIndex(walls):
+    """
+    Returns the MazeDistanceIndex for a walls grid, building it (or loading it
+    from mazeDistanceCacheDir) the first time those walls are seen.  Game
+    states of one layout share their walls Grid, so after the first call this
+    is a single dictionary lookup.
+    """
+    index = _mazeDistanceIndexesById.get(walls)
+    if index != None:
+        return index
+    key = wallsKey(walls)
+    index = _mazeDistanceIndexes.pop(key, None)
+    if index == None:
+        index = MazeDistanceIndex(walls, mazeDistanceCacheDir, key)
+    _mazeDistanceIndexes[key] = index # mark as most recently used
+    if len(_mazeDistanceIndexes) > _mazeDistanceIndexesById.maxSize:
+        _mazeDistanceIndexes.popitem(last=False)
+    _mazeDistanceIndexesById.put(walls, index)
+    return index
+
+def mazeDistanceHeuristic(position, problem, info={}):
+    """
+    The exact maze distance to the goal of a PositionSearchProblem.  It is
+    only admissible when every step costs at least 1, as with the default cost
+    function.
+    """
+    return getMazeDistanceIndex(problem.walls).distance(position, problem.goal)
+
+class BitboardMaze:
+    """
+    Breadth first search over a walls grid that moves a whole layer at a time.
+
+    Every cell is one bit of a Python int, bit x * stride + y, where stride is
+    walls.height + 1 so each column ends in a padding bit that is never open
+    and shifted bits cannot wrap into the next column.  A layer's neighbors
+    are then four shifts of the frontier, masked with the open cells and with
+    the complement of what has been visited.  Paths are read back by stepping
+    from the goal through the stored layers.
+    """
+
+    def __init__(self, walls):
+        self.width, self.height = walls.width, walls.height
+        self.stride = walls.height + 1
+        self.open = 0 # bits of the cells that are not walls
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if not walls[x][y]:
+                    self.open |= 1 << (x * self.stride + y)
+
+    def bit(self, position):
+        x, y = position
+        return 1 << (x * self.stride + y)
+
+    def mask(self, positions):
+        "Returns the bits of a list of positions or'ed together"
+        stride = self.stride
+        mask = 0
+        for x, y in positions:
+            mask |= 1 << (x * stride + y)
+        return mask
+
+    def position(self, bit):
+        "Returns the (x, y) of a single bit"
+        return divmod(bit.bit_length() - 1, self.stride)
+
+    def layers(self, start, goalMask):
+        """
+        Returns the BFS layers out from start, a list whose entry d has the
+        bits of the cells d steps away.  It stops at the first layer that
+        meets goalMask, or when nothing new can be reached.
+        """
+        stride, openBits = self.stride, self.open
+        frontier = visited = self.bit(start)
+        layers = [frontier]
+        while not frontier & goalMask:
+            frontier = ((frontier << 1) | (frontier >> 1) | (frontier << stride) | (frontier >> stride)) \
+                       & openBits & ~visited
+            if not frontier:
+                break
+            visited |= frontier
+            layers.append(frontier)
+        return layers
+
+    def backtrack(self, layers, bit):
+        "Returns the actions from start to bit, which must be in the last of layers"
+        stride = self.stride
+        actions = []
+        for layer in reversed(layers[:-1]):
+            # the neighbor in the previous layer and the move from it to bit
+            for previous, action in ((bit >> 1, Directions.NORTH), (bit << 1, Directions.SOUTH),
+                                     (bit >> stride, Directions.EAST), (bit << stride, Directions.WEST)):
+                if previous & layer:
+                    actions.append(action)
+                    bit = previous
+                    break
+        actions.reverse()
+        return actions
+
+    def pathToAny(self, start, goalMask):
+        """
+        Returns (bit, actions) for the cell of goalMask that search.bfs on an
+        AnyFoodSearchProblem reaches first, and the path bfs returns to it, or
+        (None, None) if no cell of goalMask can be reached.
+
+        The layers give the distance to the goal.  The cells of each layer are
+        then put in the order of bfs's queue: expanded in the previous layer's
+        order, each tries north, south, east, west, and keeps the first path
+        found to it.
+        """
+        layers = self.layers(start, goalMask)
+        if not layers[-1] & goalMask:
+            return None, None
+        stride = self.stride
+        startBit = self.bit(start)
+        if startBit & goalMask:
+            return startBit, []
+        parents = {startBit: None} # key is a bit, value is (parent bit, action from the parent)
+        order = [startBit]
+        for layer in layers[1:]:
+            nextOrder = []
+            for bit in order:
+                for nextBit, action in ((bit << 1, Directions.NORTH), (bit >> 1, Directions.SOUTH),
+                                        (bit << stride, Directions.EAST), (bit >> stride, Directions.WEST)):
+                    if nextBit & layer and nextBit not in parents:
+                        parents[nextBit] = (bit, action)
+                        if nextBit & goalMask:
+                            # goals are only in the last layer, so this is the first one bfs pops
+                            goal, actions = nextBit, []
+                            while parents[nextBit] != None:
+                                nextBit, action = parents[nextBit]
+                                actions.append(action)
+                            actions.reverse()
+                            return goal, actions
+                        nextOrder.append(nextBit)
+            order = nextOrder
+
+    def distance(self, point1, point2):
+        "Returns the maze distance from point1 to point2, or MazeDistanceIndex.UNREACHABLE"
+        goal = self.bit(point2)
+        layers = self.layers(point1, goal)
+        if not layers[-1] & goal:
+            return MazeDistanceIndex.UNREACHABLE
+        return len(layers) - 1
+
+_bitboardMazes = LayoutCache() # BitboardMaze of each walls grid
+
+def getBitboardMaze(walls):
+    "Returns the BitboardMaze for a walls grid, building it the first time those walls are seen"
+    maze = _bitboardMazes.get(walls)
+    if maze == None:
+        maze = BitboardMaze(walls)
+        _bitboardMazes.put(walls, maze)
+    return maze
@@ -0,0 +1,180 @@
+# searchBatch.py
+# --------------
+# Runs many SearchAgent configurations in parallel.  It loads layouts the
+# same way pacman.py does, so run it from the directory that holds the
+# layouts folder.
+
+
+"""
+Solves a batch of (layout, problem, search function, heuristic) jobs with one
+process per job and up to --workers of them running at once.  Each job has a
+time limit and an address space cap, and a line of JSON is written for every
+job as soon as it finishes, for example:
+
+> python searchBatch.py -l mediumMaze,bigMaze -f bfs,astar -H manhattanHeuristic -w 4
+
+> python searchBatch.py -j jobs.jsonl -t 60 -m 2048 -o results.jsonl
+
+A job file holds one JSON object per line with the same keys SearchAgent
+takes, e.g. {"layout": "tinyCorners", "prob": "CornersProblem", "fn": "astar",
+"heuristic": "cornersHeuristic"}.  prob defaults to PositionSearchProblem and
+heuristic to nullHeuristic.
+
+Each result repeats the job's keys and adds status, which is one of ok,
+timeout, memory or error, and for solved jobs cost, expanded, length,
+seconds and peakMemory.  Results come out in the order jobs finish, not the
+order given.
+"""
+
+import sys
+import os
+import time
+import json
+import optparse
+import multiprocessing
+import resource
+import searchAgents
+import searchBenchmark
+
+def solve(job):
+    """
+    Runs one job in the current process and returns its result dictionary.
+    SearchAgent resolves the names, so fn, prob and heuristic accept exactly
+    what pacman.py's -a option does.
+    """
+    gameState = searchBenchmark.loadGameState(job['layout'])
+    agent = searchAgents.SearchAgent(job['fn'], job['prob'], job['heuristic'])
+    startMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    starttime = time.time()
+    problem = agent.searchType(gameState)
+    actions = agent.searchFunction(problem)
+    seconds = time.time() - starttime
+    # how far the search pushed the process's peak resident set up, in the
+    # units of ru_maxrss (kilobytes on Linux)
+    peakMemory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - startMemory
+    return {'status': 'ok', 'cost': problem.getCostOfActions(actions), 'expanded': problem._expanded,
+            'length': len(actions), 'seconds': round(seconds, 4), 'peakMemory': peakMemory}
+
+def runJob(job, connection, memoryLimit):
+    "The body of a job's process: caps its memory, solves the job and sends back the result"
+    if memoryLimit != None:
+        resource.setrlimit(resource.RLIMIT_AS, (memoryLimit, memoryLimit))
+    sys.stdout = open(os.devnull, 'w') # SearchAgent and the problems print as they go
+    try:
+        result = solve(job)
+    except MemoryError:
+        result = {'status': 'memory'}
+    except Exception, e:
+        result = {'status': 'error', 'error': '%s: %s' % (e.__class__.__name__, e)}
+    connection.send(result)
+    connection.close()
+
+def runJobs(jobs, workers, timeout, memoryLimit, output):
+    """
+    Runs every job in its own process, at most workers at a time, and writes
+    each result to output as a JSON line when its job ends.  A job still
+    running after timeout seconds is killed.  Returns the list of results.
+    """
+    pending = list(jobs)
+    running = [] # (job, process, parent end of its pipe, deadline)
+    results = []
+
+    def report(job, result):
+        record = dict(job)
+        record.update(result)
+        results.append(record)
+        output.write(json.dumps(record, sort_keys=True) + '\n')
+        output.flush()
+
+    while pending or running:
+        while pending and len(running) < workers:
+            job = pending.pop(0)
+            parentEnd, childEnd = multiprocessing.Pipe(False)
+            process = multiprocessing.Process(target=runJob, args=(job, childEnd, memoryLimit))
+            process.start()
+            childEnd.close()
+            running.append((job, process, parentEnd, time.time() + timeout))
+
+        stillRunning = []
+        for job, process, connection, deadline in running:
+            if connection.poll():
+                report(job, connection.recv())
+                process.join()
+            elif not process.is_alive():
+                # it can exit between the poll and is_alive, so look once more
+                if connection.poll():
+                    report(job, connection.recv())
+                else:
+                    report(job, {'status': 'error', 'error': 'exit code %s' % process.exitcode})
+            elif time.time() > deadline:
+                process.terminate()
+                process.join()
+                report(job, {'status': 'timeout', 'seconds': timeout})
+            else:
+                stillRunning.append((job, process, connection, deadline))
+                continue
+            connection.close()
+        running = stillRunning
+        if running:
+            time.sleep(0.01)
+    return results
+
+def makeJob(layout, prob='PositionSearchProblem', fn='depthFirstSearch', heuristic='nullHeuristic'):
+    return {'layout': layout, 'prob': prob, 'fn': fn, 'heuristic': heuristic}
+
+def readJobs(path):
+    "Reads a job file of one JSON object per line; blank lines and lines starting with # are skipped"
+    jobs = []
+    for line in open(path):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            fields = json.loads(line)
+            jobs.append(makeJob(**dict([(str(key), str(value)) for key, value in fields.items()])))
+    return jobs
+
+def readCommand(argv):
+    "Processes the command used to run the batch from the command line"
+    usageStr = """
+    USAGE:      python searchBatch.py <options>
+    EXAMPLES:   python searchBatch.py -l mediumMaze,bigMaze -f bfs,astar -H manhattanHeuristic
+                python searchBatch.py -j jobs.jsonl -w 8 -t 60 -m 2048 -o results.jsonl
+    """
+    parser = optparse.OptionParser(usageStr)
+    parser.add_option('-j', '--jobs', dest='jobs', default=None,
+                      help='a file of JSON job lines; without it every combination of -l, -p, -f and -H is run')
+    parser.add_option('-l', '--layouts', dest='layouts', default='mediumMaze,bigMaze',
+                      help='comma separated layout names')
+    parser.add_option('-p', '--problems', dest='problems', default='PositionSearchProblem',
+                      help='comma separated search problem classes from searchAgents.py')
+    parser.add_option('-f', '--fns', dest='fns', default='bfs',
+                      help='comma separated search functions from search.py')
+    parser.add_option('-H', '--heuristics', dest='heuristics', default='nullHeuristic',
+                      help='comma separated heuristics, ignored by functions that take none')
+    parser.add_option('-w', '--workers', dest='workers', type='int', default=multiprocessing.cpu_count(),
+                      help='number of jobs to run at once (default: the number of cores)')
+    parser.add_option('-t', '--timeout', dest='timeout', type='float', default=300,
+                      help='seconds a job may run before it is killed')
+    parser.add_option('-m', '--memory', dest='memory', type='int', default=None,
+                      help='address space cap per job in megabytes (default: none)')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='file to write the JSON lines to (default: standard output)')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.jobs != None:
+        jobs = readJobs(options.jobs)
+    else:
+        jobs = [makeJob(layout, prob, fn, heuristic)
+                for layout in options.layouts.split(',') for prob in options.problems.split(',')
+                for fn in options.fns.split(',') for heuristic in options.heuristics.split(',')]
+    memoryLimit = None
+    if options.memory != None:
+        memoryLimit = options.memory * 1024 * 1024
+    output = sys.stdout
+    if options.output != None:
+        output = open(options.output, 'w')
+    runJobs(jobs, max(1, options.workers), options.timeout, memoryLimit, output)
@@ -0,0 +1,436 @@
+# searchBenchmark.py
+# ------------------
+# Timing harness for the search algorithms in search.py and the problems and
+# heuristics in searchAgents.py.  It loads layouts the same way pacman.py
+# does, so run it from the directory that holds the layouts folder.
+
+
+"""
+Benchmarks for the search code.  Pick a benchmark with -b and the layouts to
+run it on with -l, for example:
+
+> python searchBenchmark.py -b queues -l mediumMaze,bigMaze
+
+Every benchmark prints one row per configuration with the best wall time over
+the requested number of repeats.
+
+searchBaseline.json, next to this file, is the reference baseline for the
+suite on the synthetic room<n> and maze<n> layouts.  It holds only the status,
+path cost and nodes expanded of each run, which do not depend on the machine,
+so check a change against it with
+
+> python searchBenchmark.py -b suite -r 1 -l room4,room8,room16,maze4,maze8,maze16 --baseline searchBaseline.json
+
+and regenerate it with --save-baseline searchBaseline.json --counts-only when
+a change is meant to alter those numbers.  Baselines with times and memory
+only make sense on the machine that saved them, so keep those out of git.
+"""
+
+import os
+import re
+import sys
+import time
+import json
+import random
+import optparse
+import util
+import layout
+import pacman
+import searchAgents
+import search
+
+def loadGameState(layoutName):
+    """
+    Builds the starting GameState for a layout name, like pacman.py does.
+    Names of the form room<n> and maze<n> are generated by syntheticLayout
+    instead of being read from the layouts folder.
+    """
+    lay = syntheticLayout(layoutName) or layout.getLayout(layoutName)
+    if lay == None: raise Exception, 'The layout ' + layoutName + ' cannot be found'
+    state = pacman.GameState()
+    state.initialize(lay, 0)
+    return state
+
+def syntheticLayout(layoutName):
+    """
+    Returns a generated layout.Layout for room<n> or maze<n>, or None for any
+    other name.
+
+      room<n>  an open n by n room with a pillar on every other cell
+      maze<n>  a maze of n by n corridors carved by a depth first walk with a
+               fixed seed, so every run sees the same maze
+
+    Both have food in the four corners and Pacman in the middle, so they
+    work as position (goal (1,1)), corners and food problems of growing size.
+    """
+    match = re.match(r'^(room|maze)(\d+)$', layoutName)
+    if match == None:
+        return None
+    kind, n = match.group(1), int(match.group(2))
+    size = 2 * n + 1
+    if kind == 'room':
+        rows = [['%'] * size] + [['%'] + [' '] * (size - 2) + ['%'] for i in range(size - 2)] + [['%'] * size]
+        for y in range(2, size - 2, 2):
+            for x in range(2, size - 2, 2):
+                rows[y][x] = '%'
+    else:
+        rows = [['%'] * size for i in range(size)]
+        rand = random.Random(n)
+        rows[1][1] = ' '
+        stack = [(1, 1)]
+        while stack:
+            x, y = stack[-1]
+            options = [(x + dx, y + dy) for dx, dy in ((2, 0), (-2, 0), (0, 2), (0, -2))
+                       if 0 < x + dx < size - 1 and 0 < y + dy < size - 1 and rows[y + dy][x + dx] == '%']
+            if not options:
+                stack.pop()
+                continue
+            nextx, nexty = rand.choice(options)
+            rows[(y + nexty) / 2][(x + nextx) / 2] = ' '
+            rows[nexty][nextx] = ' '
+            stack.append((nextx, nexty))
+    for x, y in ((1, 1), (1, size - 2), (size - 2, 1), (size - 2, size - 2)):
+        rows[y][x] = '.'
+    middle = n | 1 # corridors sit on odd coordinates
+    rows[middle][middle] = 'P'
+    return layout.Layout([''.join(row) for row in rows])
+
+def bestTime(fn, repeat):
+    """
+    Calls fn() repeat times and returns (best wall time, last result).  The
+    best time is the least disturbed by whatever else the machine is doing.
+    """
+    best, result = None, None
+    for i in range(repeat):
+        starttime = time.time()
+        result = fn()
+        elapsed = time.time() - starttime
+        if best == None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def printRow(columns):
+    print '  '.join([str(column).ljust(24) for column in columns]).rstrip()
+
+def benchmarkQueues(layoutNames, repeat):
+    """
+    uniformCostSearch with util.PriorityQueue against IndexedPriorityQueue,
+    using the StayEast and StayWest cost functions so that update has real
+    decrease-key work to do.
+    """
+    costFns = [('StayEast', lambda pos: .5 ** pos[0]), ('StayWest', lambda pos: 2 ** pos[0])]
+    queues = [('util.PriorityQueue', util.PriorityQueue),
+              ('IndexedPriorityQueue', search.IndexedPriorityQueue)]
+    printRow(['layout', 'cost function', 'queue', 'seconds', 'path cost'])
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for costName, costFn in costFns:
+            for queueName, queue in queues:
+                def run():
+                    problem = searchAgents.PositionSearchProblem(gameState, costFn, warn=False, visualize=False)
+                    return problem.getCostOfActions(search.ucs(problem, frontier=queue))
+                seconds, cost = bestTime(run, repeat)
+                printRow([layoutName, costName, queueName, '%.4f' % seconds, cost])
+
+def benchmarkJumpPoints(layoutNames, repeat):
+    """
+    A* against Jump Point Search on a PositionSearchProblem, both with the
+    Manhattan heuristic.  Expanded counts are states for A* and jump points
+    for JPS.
+    """
+    searches = [('astar', search.aStarSearch), ('jps', search.jumpPointSearch)]
+    printRow(['layout', 'search', 'seconds', 'expanded', 'path cost'])
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for searchName, searchFunction in searches:
+            def run():
+                problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+                actions = searchFunction(problem, heuristic=searchAgents.manhattanHeuristic)
+                return problem._expanded, problem.getCostOfActions(actions)
+            seconds, (expanded, cost) = bestTime(run, repeat)
+            printRow([layoutName, searchName, '%.4f' % seconds, expanded, cost])
+
+def sampleFoodStates(problem, count, seed=0):
+    """
+    Returns count states of a PackedFoodSearchProblem along a random walk from
+    its start, so that consecutive states are parent and child the way they
+    are when A* generates them.
+    """
+    rand = random.Random(seed)
+    state = problem.getStartState()
+    states = []
+    while len(states) < count:
+        states.append(state)
+        state = rand.choice(problem.getSuccessors(state))[0]
+        if problem.isGoalState(state):
+            state = problem.getStartState()
+    return states
+
+def benchmarkSpanningTrees(layoutNames, repeat):
+    """
+    The food MST heuristic computed three ways on the same sampled states:
+    the edge dictionary and heap of foodConnections and minSpanTree, the dense
+    Prim of FoodSpanningTrees over its distance matrix, and the incremental
+    FoodSpanningTrees.weight that reuses the tree over the food.
+    """
+    printRow(['layout', 'food', 'method', 'seconds', 'weight sum'])
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        problem = searchAgents.PackedFoodSearchProblem(gameState)
+        states = sampleFoodStates(problem, 2000)
+        def dictionaryHeap():
+            total = 0
+            for state in states:
+                position, foodList = problem.positionAndFood(state)
+                nodes = [position] + foodList
+                total += searchAgents.minSpanTree(nodes, searchAgents.foodConnections(nodes, gameState))[1]
+            return total
+        def densePrim():
+            trees = searchAgents.FoodSpanningTrees(problem.foodPositions)
+            return sum([trees.denseWeight(*problem.positionAndFoodMask(state)) for state in states])
+        def incremental():
+            trees = searchAgents.FoodSpanningTrees(problem.foodPositions)
+            return sum([trees.weight(*problem.positionAndFoodMask(state)) for state in states])
+        for methodName, method in [('dictionary and heap', dictionaryHeap),
+                                   ('dense Prim', densePrim), ('incremental', incremental)]:
+            seconds, total = bestTime(method, repeat)
+            printRow([layoutName, len(problem.foodPositions), methodName, '%.4f' % seconds, '%.4f' % total])
+
+def benchmarkFoodHeuristics(layoutNames, repeat):
+    """
+    A* on a PackedFoodSearchProblem with the straight line MST heuristic and
+    with the maze distance heuristic that foodHeuristic now uses.
+    """
+    heuristics = [('foodMSTHeuristic', searchAgents.foodMSTHeuristic),
+                  ('foodMazeHeuristic', searchAgents.foodMazeHeuristic)]
+    printRow(['layout', 'heuristic', 'seconds', 'expanded', 'path cost'])
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for heuristicName, heuristic in heuristics:
+            def run():
+                problem = searchAgents.PackedFoodSearchProblem(gameState)
+                actions = search.aStarSearch(problem, heuristic)
+                return problem._expanded, problem.getCostOfActions(actions)
+            seconds, (expanded, cost) = bestTime(run, repeat)
+            printRow([layoutName, heuristicName, '%.4f' % seconds, expanded, cost])
+
+def benchmarkBatchSuccessors(layoutNames, repeat):
+    """
+    breadthFirstSearch against batchBreadthFirstSearch, which expands each
+    layer with one getSuccessorsBatch call, on PositionSearchProblem.
+    """
+    searches = [('bfs', search.breadthFirstSearch), ('batchbfs', search.batchBreadthFirstSearch)]
+    printRow(['layout', 'search', 'seconds', 'expanded', 'path cost'])
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for searchName, searchFunction in searches:
+            def run():
+                problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+                actions = searchFunction(problem)
+                return problem._expanded, problem.getCostOfActions(actions)
+            seconds, (expanded, cost) = bestTime(run, repeat)
+            printRow([layoutName, searchName, '%.4f' % seconds, expanded, cost])
+
+SUITE_LAYOUTS = ['tinyMaze', 'mediumMaze', 'bigMaze', 'tinyCorners', 'mediumCorners', 'tinySearch',
+                 'room4', 'room8', 'room16', 'maze4', 'maze8', 'maze16']
+SUITE_SEARCHES = [
+    ('PositionSearchProblem', ['dfs', 'bfs', 'ucs'], ['manhattanHeuristic', 'euclideanHeuristic', 'mazeDistanceHeuristic']),
+    ('CornersProblem', ['dfs', 'bfs', 'ucs'], ['cornersHeuristic']),
+    ('FoodSearchProblem', ['dfs', 'bfs', 'ucs'], ['foodHeuristic', 'foodMSTHeuristic']),
+]
+
+def suiteJobs(layoutNames):
+    """
+    The suite's jobs for searchBatch: on every layout, every problem in
+    SUITE_SEARCHES with each uninformed search, and with astar under each of
+    its heuristics.
+    """
+    import searchBatch
+    jobs = []
+    for layoutName in layoutNames:
+        for prob, fns, heuristics in SUITE_SEARCHES:
+            for fn in fns:
+                jobs.append(searchBatch.makeJob(layoutName, prob, fn))
+            for heuristic in heuristics:
+                jobs.append(searchBatch.makeJob(layoutName, prob, 'astar', heuristic))
+    return jobs
+
+def suiteKey(job):
+    return '%(layout)s %(prob)s %(fn)s %(heuristic)s' % job
+
+def suiteRegressions(result, baseline, tolerance):
+    """
+    Returns what got worse in result compared to its baseline entry: a
+    different status or path cost, more nodes expanded, or more than
+    tolerance (a fraction) extra time or peak memory.  Times under 50ms and
+    memory under 1MB are too noisy to compare, and a baseline saved with
+    countsOnly has no times or memory to compare against.
+    """
+    if result['status'] != baseline['status']:
+        return ['status %s, was %s' % (result['status'], baseline['status'])]
+    if result['status'] != 'ok':
+        return []
+    regressions = []
+    if result['cost'] != baseline['cost']:
+        regressions.append('cost %s, was %s' % (result['cost'], baseline['cost']))
+    if result['expanded'] > baseline['expanded']:
+        regressions.append('expanded %d, was %d' % (result['expanded'], baseline['expanded']))
+    if 'seconds' not in baseline:
+        return regressions
+    if result['seconds'] > max(baseline['seconds'], .05) * (1 + tolerance):
+        regressions.append('%.4fs, was %.4fs' % (result['seconds'], baseline['seconds']))
+    if result['peakMemory'] > max(baseline['peakMemory'], 1024) * (1 + tolerance):
+        regressions.append('peak memory %d, was %d' % (result['peakMemory'], baseline['peakMemory']))
+    return regressions
+
+def benchmarkSuite(layoutNames, repeat, baselinePath=None, savePath=None, tolerance=.25, timeout=60, workers=1,
+                   countsOnly=False):
+    """
+    The standard suite: dfs, bfs, ucs and astar with each heuristic, on the
+    position, corners and food problems, over bundled and synthetic layouts
+    of growing size.  Every run is its own process (see searchBatch), so peak
+    memory is per run.  Rows show wall time, nodes expanded, nodes per
+    second and peak memory growth, keeping the best time and memory of
+    repeat runs.
+
+    With baselinePath, each row is compared with the stored results and the
+    regressions are listed at the end.  With savePath, the results are
+    written there as the new baseline; with countsOnly as well, only the
+    status, cost and nodes expanded of the runs that finished are written,
+    which is how searchBaseline.json is made.  Returns the number of
+    regressions.
+    """
+    import searchBatch
+    best = {} # key is suiteKey(job), value is the best result seen for it
+    devnull = open(os.devnull, 'w')
+    for i in range(repeat):
+        for result in searchBatch.runJobs(suiteJobs(layoutNames), workers, timeout, None, devnull):
+            key = suiteKey(result)
+            if key not in best or result['status'] != 'ok':
+                best[key] = result
+            elif best[key]['status'] == 'ok':
+                best[key]['seconds'] = min(best[key]['seconds'], result['seconds'])
+                best[key]['peakMemory'] = min(best[key]['peakMemory'], result['peakMemory'])
+
+    baseline = {}
+    if baselinePath != None:
+        baseline = json.load(open(baselinePath))
+    regressions = []
+    printRow(['layout', 'problem', 'search', 'status', 'seconds', 'expanded', 'nodes/s', 'peak memory', 'baseline'])
+    for job in suiteJobs(layoutNames):
+        key = suiteKey(job)
+        result = best[key]
+        comparison = ''
+        if key in baseline:
+            found = suiteRegressions(result, baseline[key], tolerance)
+            regressions += [key + ': ' + regression for regression in found]
+            comparison = found and 'WORSE' or 'ok'
+        elif baselinePath != None:
+            comparison = 'new'
+        searchName = job['fn']
+        if job['fn'] == 'astar':
+            searchName = 'astar ' + job['heuristic']
+        if result['status'] == 'ok':
+            nodesPerSecond = result['expanded'] / max(result['seconds'], 1e-6)
+            printRow([job['layout'], job['prob'], searchName, 'ok', '%.4f' % result['seconds'], result['expanded'],
+                      '%.0f' % nodesPerSecond, result['peakMemory'], comparison])
+        else:
+            printRow([job['layout'], job['prob'], searchName, result['status'], '', '', '', '', comparison])
+
+    if savePath != None:
+        saved = best
+        if countsOnly:
+            saved = dict([(key, {'status': result['status'], 'cost': result['cost'], 'expanded': result['expanded']})
+                          for key, result in best.items() if result['status'] == 'ok'])
+        f = open(savePath, 'w')
+        json.dump(saved, f, sort_keys=True, indent=1, separators=(',', ': '))
+        f.write('\n')
+        f.close()
+    if regressions:
+        print '%d regressions against %s:' % (len(regressions), baselinePath)
+        for regression in regressions:
+            print '  ' + regression
+    return len(regressions)
+
+def benchmarkHeadless(layoutNames, repeat):
+    """
+    Throughput of bfs and astar on a PositionSearchProblem with the display
+    bookkeeping on, headless, and headless with a 1 in 10 ExpansionTrace.
+    """
+    modes = [('bookkeeping', {}), ('headless', {'headless': True}),
+             ('headless + trace', {'headless': True, 'trace': 10})]
+    searches = [('bfs', search.breadthFirstSearch),
+                ('astar', lambda problem: search.aStarSearch(problem, searchAgents.manhattanHeuristic))]
+    printRow(['layout', 'search', 'mode', 'seconds', 'nodes/s'])
+    for layoutName in layoutNames:
+        gameState = loadGameState(layoutName)
+        for searchName, searchFunction in searches:
+            for modeName, options in modes:
+                def run():
+                    keywords = dict(options)
+                    if 'trace' in keywords:
+                        keywords['trace'] = searchAgents.ExpansionTrace(keywords['trace'])
+                    problem = searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False, **keywords)
+                    searchFunction(problem)
+                    return problem._expanded
+                seconds, expanded = bestTime(run, repeat)
+                printRow([layoutName, searchName, modeName, '%.4f' % seconds, '%.0f' % (expanded / seconds)])
+
+BENCHMARKS = {
+    'queues': benchmarkQueues,
+    'jps': benchmarkJumpPoints,
+    'mst': benchmarkSpanningTrees,
+    'food': benchmarkFoodHeuristics,
+    'batch': benchmarkBatchSuccessors,
+    'suite': benchmarkSuite,
+    'headless': benchmarkHeadless,
+}
+
+def readCommand(argv):
+    "Processes the command used to run the benchmarks from the command line"
+    usageStr = """
+    USAGE:      python searchBenchmark.py <options>
+    EXAMPLES:   python searchBenchmark.py -b queues -l mediumMaze,bigMaze
+                python searchBenchmark.py -b jps -l mediumMaze,bigMaze,openMaze
+                python searchBenchmark.py -b mst -l trickySearch,mediumSearch
+                python searchBenchmark.py -b food -l trickySearch
+                python searchBenchmark.py -b suite -r 1 --save-baseline baseline.json
+                python searchBenchmark.py -b suite --baseline baseline.json
+                python searchBenchmark.py -b suite -r 1 -l room4,room8,room16,maze4,maze8,maze16 --baseline searchBaseline.json
+    """
+    parser = optparse.OptionParser(usageStr)
+    parser.add_option('-b', '--benchmark', dest='benchmark', default='queues',
+                      help='the benchmark to run, one of: ' + ', '.join(sorted(BENCHMARKS.keys())))
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layout names to benchmark on (default: mediumMaze,bigMaze, '
+                           'or the standard layouts for the suite)')
+    parser.add_option('-r', '--repeat', dest='repeat', type='int', default=3,
+                      help='number of timed runs per configuration')
+    parser.add_option('--baseline', dest='baseline', default=None,
+                      help='suite only: a saved baseline to compare against')
+    parser.add_option('--save-baseline', dest='saveBaseline', default=None,
+                      help='suite only: file to save the results to as a new baseline')
+    parser.add_option('--counts-only', dest='countsOnly', action='store_true', default=False,
+                      help='suite only: save only the machine independent status, cost and nodes expanded')
+    parser.add_option('--tolerance', dest='tolerance', type='float', default=.25,
+                      help='suite only: fraction of extra time or memory allowed before a run counts as a regression')
+    parser.add_option('-t', '--timeout', dest='timeout', type='float', default=60,
+                      help='suite only: seconds a run may take before it is killed')
+    parser.add_option('-w', '--workers', dest='workers', type='int', default=1,
+                      help='suite only: runs at once; more than 1 is faster but disturbs the timings')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    if options.benchmark not in BENCHMARKS:
+        raise Exception('Unknown benchmark: ' + options.benchmark)
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.benchmark == 'suite':
+        layoutNames = options.layouts and options.layouts.split(',') or SUITE_LAYOUTS
+        regressions = benchmarkSuite(layoutNames, options.repeat, options.baseline, options.saveBaseline,
+                                     options.tolerance, options.timeout, options.workers, options.countsOnly)
+        sys.exit(regressions and 1 or 0)
+    layoutNames = (options.layouts or 'mediumMaze,bigMaze').split(',')
+    BENCHMARKS[options.benchmark](layoutNames, options.repeat)
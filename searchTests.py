@@ -0,0 +1,52 @@
+# searchTests.py
+# --------------
+# Regression tests for the search code in search.py and searchAgents.py.
+# They run on the synthetic layouts of searchBenchmark, so they need
+# pacman.py and the other project files but not the layouts folder:
+#
+# > python -m unittest searchTests
+
+
+import unittest
+import searchAgents
+import search
+from searchBenchmark import loadGameState
+
+# small layouts with food in the four corners (see searchBenchmark.syntheticLayout)
+LAYOUTS = ['room4', 'maze4']
+
+class AnyFoodSearchProblemTest(unittest.TestCase):
+
+    def testEverySearch(self):
+        "Every search runs on AnyFoodSearchProblem, which skips PositionSearchProblem.__init__"
+        for layoutName in LAYOUTS:
+            gameState = loadGameState(layoutName)
+            for searchFunction in [search.bfs, search.dfs, search.ucs, search.astar, search.batchBreadthFirstSearch]:
+                name = layoutName + ' ' + searchFunction.__name__
+                problem = searchAgents.AnyFoodSearchProblem(gameState)
+                actions = searchFunction(problem)
+                self.assertTrue(len(actions) > 0, name + ': no path')
+                self.assertEqual(problem.getCostOfActions(actions), len(actions), name + ': illegal path')
+
+class AnytimeAStarTest(unittest.TestCase):
+
+    def testZeroTimeLimit(self):
+        """
+        ARA* with no time at all still finishes its first plan and reports a
+        bound.  That first plan is a full nullHeuristic pass over the food
+        states, so these layouts keep to a handful of food.
+        """
+        for layoutName in LAYOUTS:
+            gameState = loadGameState(layoutName)
+            goal = gameState.getFood().asList()[0]
+            problems = [searchAgents.PositionSearchProblem(gameState, goal=goal, warn=False, visualize=False),
+                        searchAgents.PackedFoodSearchProblem(gameState)]
+            for problem in problems:
+                name = layoutName + ' ' + problem.__class__.__name__
+                stats = search.SearchStats()
+                actions = search.anytimeAStarSearch(problem, search.nullHeuristic, timeLimit=0, stats=stats)
+                self.assertTrue(len(actions) > 0, name + ': no plan')
+                self.assertTrue(stats.bound != None and stats.bound >= 1.0, name + ': bound %s' % stats.bound)
+
+if __name__ == '__main__':
+    unittest.main()